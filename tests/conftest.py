@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
 PROJECT_DIR_NAME = 'yatube'
@@ -37,3 +39,15 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def no_metrics_sampling(settings):
+    # замеры тестовых запросов не должны попадать в общий кеш метрик
+    settings.METRICS_SAMPLE_RATE = 0
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    # mixer заполняет ImageField: картинки пишутся во временный каталог
+    settings.MEDIA_ROOT = str(tmp_path)
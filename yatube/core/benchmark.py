@@ -0,0 +1,282 @@
+"""Нагрузочный прогон Yatube: данные, локальный сервер и клиенты.
+
+Сервер работает в том же процессе, поэтому запросы к базе считаются
+прямо в WSGI-обёртке, без сэмплирования core.middleware.
+"""
+import collections
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer, WSGIRequestHandler
+)
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from posts import seeding
+from posts.counters import recount
+from posts.models import AuthorStats, Follow, Group, Post
+
+from . import metrics
+
+User = get_user_model()
+
+SIZES = {'10k': 10 ** 4, '100k': 10 ** 5, '1m': 10 ** 6}
+BENCH_USERNAME = 'benchmark'
+BENCH_PASSWORD = 'benchmark-password'
+SCENARIO_HEADER = 'X-Benchmark-Scenario'
+# Доля страниц из кеша меняется от прогона к прогону, поэтому среднее
+# число запросов сравнивается с запасом.
+QUERY_SLACK = 0.5
+FOLLOWED_AUTHORS = 20
+
+
+def seed(posts, users, groups, batch_size=5000):
+    """Заполняет базу как seed_yatube и создаёт пользователя для входа."""
+    author_ids = seeding.seed_users(users, 'bench', batch_size)
+    group_ids = seeding.seed_groups(groups, 'bench', batch_size)
+    User.objects.create_user(BENCH_USERNAME, password=BENCH_PASSWORD)
+    seeding.seed_posts(posts, author_ids, group_ids, days=3 * 365,
+                       batch_size=batch_size)
+    recount(AuthorStats, Group, Post, Follow)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class BenchmarkServer(ThreadedWSGIServer):
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            # Поток запроса завершается: его соединения больше не нужны.
+            connections.close_all()
+
+
+class QueryCountingApp:
+    """WSGI-приложение Django, которое считает запросы к базе."""
+
+    def __init__(self, app):
+        self.app = app
+        self.queries = collections.defaultdict(list)
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        scenario = environ.get(
+            'HTTP_' + SCENARIO_HEADER.upper().replace('-', '_')
+        )
+        with metrics.collect(metrics.Sample()) as sample:
+            response = self.app(environ, start_response)
+        with self.lock:
+            self.queries[scenario].append(sample.queries)
+        return response
+
+
+def start_server(app):
+    server = BenchmarkServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(app)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    """Клиент с cookie: анонимный или вошедший пользователь."""
+
+    def __init__(self, base_url, user=None):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(NoRedirect)
+        self.cookies = {}
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            name = settings.SESSION_COOKIE_NAME
+            self.cookies[name] = client.cookies[name].value
+            self.request('GET', reverse('posts:post_create'), 'login')
+
+    def request(self, method, path, scenario, data=None):
+        headers = {SCENARIO_HEADER: scenario}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+        body = None
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.cookies.get(
+                settings.CSRF_COOKIE_NAME, ''))
+            body = urllib.parse.urlencode(data).encode()
+        request = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method
+        )
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as error:
+            status, response_headers = error.code, error.headers
+        for header in response_headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return status
+
+
+def scenarios(user):
+    """Сценарии: имя, нужен ли вход и функция, выполняющая запрос."""
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+    slugs = list(Group.objects.values_list('slug', flat=True)[:1000])
+    usernames = list(AuthorStats.objects.values_list(
+        'author__username', flat=True)[:1000])
+    own_post = Post.objects.create(author=user, text='Пост для правки')
+    for author_id in AuthorStats.objects.exclude(author=user).order_by(
+            '-posts_count').values_list('author_id', flat=True)[
+                :FOLLOWED_AUTHORS]:
+        Follow.objects.get_or_create(user=user, author_id=author_id)
+
+    def pick(values):
+        return random.choice(values) if values else None
+
+    return [
+        ('index', False, lambda s: s.request(
+            'GET', reverse('posts:index'), 'index')),
+        ('index_page', False, lambda s: s.request(
+            'GET', reverse('posts:index') + f'?page={random.randint(1, 50)}',
+            'index_page')),
+        ('group_list', False, lambda s: s.request(
+            'GET', reverse('posts:group_list', args=[pick(slugs)]),
+            'group_list')),
+        ('profile', False, lambda s: s.request(
+            'GET', reverse('posts:profile', args=[pick(usernames)]),
+            'profile')),
+        ('post_detail', False, lambda s: s.request(
+            'GET', reverse('posts:post_detail', args=[pick(post_ids)]),
+            'post_detail')),
+        ('follow_index', True, lambda s: s.request(
+            'GET', reverse('posts:follow_index'), 'follow_index')),
+        ('post_create', True, lambda s: s.request(
+            'POST', reverse('posts:post_create'), 'post_create',
+            {'text': 'Пост из нагрузочного теста'})),
+        ('post_edit', True, lambda s: s.request(
+            'POST', reverse('posts:post_edit', args=[own_post.pk]),
+            'post_edit', {'text': f'Правка {random.random()}'})),
+        ('login', False, lambda s: s.request(
+            'GET', reverse('users:login'), 'login')),
+        ('signup', False, lambda s: s.request(
+            'GET', reverse('users:signup'), 'signup')),
+        ('password_reset', False, lambda s: s.request(
+            'GET', reverse('users:password_reset'), 'password_reset')),
+        ('about_author', False, lambda s: s.request(
+            'GET', reverse('about:author'), 'about_author')),
+        ('about_tech', False, lambda s: s.request(
+            'GET', reverse('about:tech'), 'about_tech')),
+    ]
+
+
+def percentile(values, fraction):
+    """Значение, не меньше которого доля fraction отсортированных."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(latencies, elapsed, queries, errors):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'queries': sum(queries) / len(queries) if queries else 0.0,
+    }
+
+
+def run(requests, clients):
+    """Гоняет каждый сценарий requests раз в clients потоков."""
+    app = QueryCountingApp(get_wsgi_application())
+    server = start_server(app)
+    base_url = 'http://127.0.0.1:%s' % server.server_address[1]
+    user = User.objects.get(username=BENCH_USERNAME)
+    results = {}
+    try:
+        for name, login, call in scenarios(user):
+            sessions = [Session(base_url, user if login else None)
+                        for _ in range(clients)]
+            app.queries.clear()
+
+            def worker(session, count):
+                timings, failed = [], 0
+                for _ in range(count):
+                    started = time.perf_counter()
+                    status = call(session)
+                    timings.append(time.perf_counter() - started)
+                    failed += status >= 400
+                return timings, failed
+
+            shares = [requests // clients + (i < requests % clients)
+                      for i in range(clients)]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(clients) as executor:
+                done = list(executor.map(worker, sessions, shares))
+            elapsed = time.perf_counter() - started
+            results[name] = summarize(
+                [timing for timings, _ in done for timing in timings],
+                elapsed, app.queries.get(name, []),
+                sum(failed for _, failed in done),
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Регрессии относительно базовой линии: p95 или число запросов."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p95 {previous["p95_ms"]:.1f} → '
+                f'{current["p95_ms"]:.1f} мс'
+            )
+        if current['queries'] > previous['queries'] + QUERY_SLACK:
+            regressions.append(
+                f'{name}: запросов {previous["queries"]:.1f} → '
+                f'{current["queries"]:.1f}'
+            )
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,88 @@
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+from django.template import (
+    TemplateDoesNotExist, TemplateSyntaxError, engines
+)
+from django.template.backends.django import DjangoTemplates
+from django.templatetags.static import StaticNode
+
+from .warmup import template_names
+
+# Путь к статике без {% static %}: на вложенных страницах он указывает
+# не туда.
+RELATIVE_STATIC = re.compile(
+    r'(?:href|src)="(?![a-z]+:|/|#|\{)([^"]+\.(?:css|js|ico|png|jpe?g|'
+    r'gif|svg|webp))"'
+)
+
+
+def static_paths(template):
+    """Постоянные пути из тегов {% static %} шаблона."""
+    for node in template.nodelist.get_nodes_by_type(StaticNode):
+        if isinstance(node.path.var, str) and not node.path.filters:
+            yield node.path.var
+
+
+@register(Tags.templates)
+def check_static_references(app_configs, **kwargs):
+    """Все пути {% static %} в шаблонах находятся в статике."""
+    messages = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend):
+            try:
+                template = backend.get_template(name).template
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+            for path in static_paths(template):
+                if finders.find(path) is None:
+                    messages.append(Error(
+                        f'{name}: статический файл {path} не найден.',
+                        id='core.E001',
+                    ))
+            for path in RELATIVE_STATIC.findall(template.source):
+                messages.append(Warning(
+                    f'{name}: относительный путь к статике {path}.',
+                    hint="Используйте {% static '...' %}.",
+                    id='core.W001',
+                ))
+    return messages
+
+
+@register(Tags.caches)
+def check_metrics_cache(app_configs, **kwargs):
+    """Метрики пишутся в кеш, общий для всех процессов."""
+    if not settings.METRICS_SAMPLE_RATE:
+        return []
+    alias = settings.METRICS_CACHE_ALIAS
+    if isinstance(caches[alias], (LocMemCache, DummyCache)):
+        return [Error(
+            f'Кеш метрик {alias!r} не общий для процессов: query_metrics '
+            'не увидит замеры воркеров.',
+            hint='Укажите в METRICS_CACHE_ALIAS файловый кеш, Redis или '
+                 'Memcached либо выключите METRICS_SAMPLE_RATE.',
+            id='core.E002',
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_page_cache(app_configs, **kwargs):
+    """На боевом сервере кеш страниц общий для всех воркеров."""
+    alias = settings.PAGE_CACHE_ALIAS
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Error(
+        f'Кеш страниц {alias!r} хранится в памяти процесса: запись поста '
+        'сбросит страницы только в своём воркере, а версии областей и '
+        'ETag у воркеров разойдутся.',
+        hint='Укажите CACHE_BACKEND с файловым кешем, Redis или Memcached.',
+        id='core.E003',
+    )]
@@ -0,0 +1,8 @@
+from django.conf import settings
+
+
+def cache_timeouts(request):
+    """Добавляет время жизни кешируемых фрагментов шаблонов."""
+    return {
+        'post_card_timeout': settings.POST_CARD_CACHE_TIMEOUT
+    }
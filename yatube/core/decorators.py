@@ -0,0 +1,46 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """View выполнила больше запросов к базе, чем ей разрешено."""
+
+
+def query_budget(limit):
+    """Следит, чтобы view укладывалась в limit запросов к базе.
+
+    При QUERY_BUDGET_STRICT превышение бросает QueryBudgetExceeded и
+    роняет тесты, иначе только пишется предупреждение в лог.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                response = view(request, *args, **kwargs)
+                # Ленивые шаблонные ответы обращаются к базе при рендеринге.
+                if hasattr(response, 'render'):
+                    response.render()
+            if len(queries) > limit:
+                message = (
+                    f'{view.__module__}.{view.__name__}: '
+                    f'{len(queries)} запросов при бюджете {limit}'
+                )
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(
+                        message + ':\n' + '\n'.join(queries)
+                    )
+                logger.warning(message)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,174 @@
+"""Очередь исходящей почты.
+
+QueuedEmailBackend сохраняет письма в таблицу QueuedEmail и сразу
+возвращается, поэтому запрос не ждёт почтовый сервер. Команда
+send_queued_mail забирает письма пачками, отправляет каждую пачку через
+одно соединение настоящего бэкенда (QUEUED_EMAIL_BACKEND) и повторяет
+неудачные попытки с растущей задержкой. Отправленные письма удаляются,
+письма без оставшихся попыток остаются в таблице с текстом ошибки.
+Письмо, которое не удалось собрать (испорченная запись, перевод строки
+в теме), сразу исчерпывает попытки: повтор его не исправит.
+"""
+import base64
+import json
+import logging
+import smtplib
+import uuid
+from datetime import timedelta
+from email import message_from_bytes
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+# Ошибки почтовых бэкендов: SMTP, сети и файловой системы.
+DELIVERY_ERRORS = (smtplib.SMTPException, OSError)
+FIELDS = ('subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+          'extra_headers', 'alternatives', 'content_subtype',
+          'mixed_subtype')
+
+
+def serialize_attachment(attachment):
+    """Вложение как [тип, ...]: кортеж Django или готовая MIME-часть."""
+    if isinstance(attachment, MIMEBase):
+        return ['mime', base64.b64encode(attachment.as_bytes()).decode()]
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return ['file', filename, base64.b64encode(content).decode(), mimetype]
+
+
+def deserialize_attachment(data):
+    kind, *data = data
+    if kind == 'file':
+        filename, content, mimetype = data
+        return filename, base64.b64decode(content), mimetype
+    part = message_from_bytes(base64.b64decode(data[0]))
+    # Django прикладывает как часть только MIMEBase, а разбор файла
+    # возвращает Message: переносим заголовки и содержимое.
+    mime = MIMEBase(*part.get_content_type().split('/'))
+    del mime['Content-Type'], mime['MIME-Version']
+    for header, value in part.items():
+        mime[header] = value
+    mime.set_payload(part.get_payload())
+    return mime
+
+
+def serialize(message):
+    payload = {field: getattr(message, field, None) for field in FIELDS}
+    payload['alternatives'] = [list(item) for item in
+                               payload['alternatives'] or ()]
+    payload['encoding'] = str(message.encoding) if message.encoding else None
+    payload['attachments'] = [serialize_attachment(attachment)
+                              for attachment in message.attachments]
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def deserialize(payload, connection=None):
+    data = json.loads(payload)
+    message = EmailMultiAlternatives(
+        subject=data['subject'], body=data['body'],
+        from_email=data['from_email'], to=data['to'], cc=data['cc'],
+        bcc=data['bcc'], reply_to=data['reply_to'],
+        headers=data['extra_headers'], connection=connection,
+        alternatives=[tuple(item) for item in data['alternatives']],
+        attachments=[deserialize_attachment(item)
+                     for item in data['attachments']],
+    )
+    message.content_subtype = data['content_subtype']
+    message.mixed_subtype = data['mixed_subtype']
+    message.encoding = data['encoding']
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь одним INSERT вместо отправки."""
+
+    def send_messages(self, email_messages):
+        messages = [message for message in email_messages
+                    if message.recipients()]
+        QueuedEmail.objects.bulk_create(
+            QueuedEmail(payload=serialize(message)) for message in messages
+        )
+        return len(messages)
+
+
+def claim(batch_size):
+    """Забирает пачку писем и откладывает их на время аренды.
+
+    Письма захватываются условным UPDATE с меткой обработчика: из
+    выбранных строк он получает только те, что никто не успел забрать,
+    поэтому параллельные обработчики не отправят письмо дважды и на
+    SQLite, где нет SKIP LOCKED. Пока аренда не истекла, письма не видны
+    другим обработчикам; если обработчик упал, письма вернутся в очередь
+    после неё.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(
+        next_attempt_at__lte=now,
+        attempts__lt=settings.QUEUED_EMAIL_MAX_ATTEMPTS,
+    )
+    ids = list(due.order_by('next_attempt_at').values_list(
+        'pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(
+        claim_token=token,
+        next_attempt_at=now + timedelta(seconds=settings.QUEUED_EMAIL_LEASE),
+    )
+    return list(QueuedEmail.objects.filter(
+        claim_token=token).order_by('pk'))
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.QUEUED_EMAIL_RETRY_DELAY
+                     * 2 ** (attempts - 1))
+
+
+def fail(email, error, final=False):
+    """Тратит попытку; final=True переводит письмо в отказ."""
+    email.attempts = (settings.QUEUED_EMAIL_MAX_ATTEMPTS if final
+                      else email.attempts + 1)
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=('attempts', 'last_error', 'next_attempt_at'))
+
+
+def deliver(batch_size=None):
+    """Отправляет одну пачку; возвращает (отправлено, с ошибкой)."""
+    batch = claim(batch_size or settings.QUEUED_EMAIL_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+    sent = []
+    failed = 0
+    backend = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    try:
+        backend.open()
+    except DELIVERY_ERRORS as error:
+        for email in batch:
+            fail(email, error)
+        return 0, len(batch)
+    try:
+        for email in batch:
+            try:
+                backend.send_messages([deserialize(email.payload, backend)])
+            except DELIVERY_ERRORS as error:
+                fail(email, error)
+                failed += 1
+            except Exception as error:
+                logger.exception('Письмо %s не отправлено', email.pk)
+                fail(email, error, final=True)
+                failed += 1
+            else:
+                sent.append(email.pk)
+    finally:
+        backend.close()
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+    return len(sent), failed
@@ -0,0 +1,81 @@
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+from posts.models import Post
+
+COLUMNS = ('requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'rps',
+           'queries')
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон: заполняет базу, запускает локальный '
+            'сервер и гоняет по нему параллельных клиентов. Запускать '
+            'с YATUBE_ENV=bench, чтобы не трогать рабочую базу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=benchmark.SIZES,
+                            default='10k', help='Количество постов.')
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Запросов на каждый сценарий.')
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument('--baseline', default=os.path.join(
+            settings.BASE_DIR, 'benchmark_baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базовой линии.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Запустить не в профиле bench и заполнить текущую базу.'
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.BENCHMARK_DATABASE or options['force']):
+            name = settings.DATABASES['default']['NAME']
+            raise CommandError(
+                f'Прогон заполнит базу {name}. Запустите его с '
+                'DJANGO_SETTINGS_MODULE=yatube.settings.bench или '
+                'YATUBE_ENV=bench либо добавьте --force.'
+            )
+        call_command('migrate', verbosity=0)
+        if not Post.objects.exists():
+            self.stdout.write('Заполнение базы...')
+            benchmark.seed(benchmark.SIZES[options['size']],
+                           options['users'], options['groups'])
+        results = benchmark.run(options['requests'], options['clients'])
+        self.report(results)
+        path = options['baseline']
+        if options['save_baseline']:
+            benchmark.save_baseline(path, results)
+            self.stdout.write(f'Базовая линия сохранена в {path}')
+            return
+        baseline = benchmark.load_baseline(path)
+        if baseline is None:
+            self.stdout.write(f'Базовой линии {path} нет, сравнение '
+                              'пропущено (--save-baseline создаст её).')
+            return
+        regressions = benchmark.compare(results, baseline,
+                                        options['tolerance'])
+        if regressions:
+            raise CommandError('Регрессии относительно базовой линии:\n'
+                               + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def report(self, results):
+        self.stdout.write(f'{"":<16}' + ''.join(
+            f'{column:>10}' for column in COLUMNS))
+        for name, row in results.items():
+            self.stdout.write(f'{name:<16}' + ''.join(
+                f'{row[column]:>10.1f}' for column in COLUMNS))
+        total = sum(row['requests'] for row in results.values())
+        seconds = sum(row['requests'] / row['rps']
+                      for row in results.values() if row['rps'])
+        self.stdout.write(f'Всего: {total} запросов, '
+                          f'{total / seconds if seconds else 0:.1f} в секунду')
@@ -0,0 +1,42 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.metrics import METRICS, snapshot
+
+COLUMNS = ('p50', 'p95', 'p99', 'mean')
+
+
+class Command(BaseCommand):
+    help = ('Выводит скользящие гистограммы метрик по view: число и время '
+            'SQL-запросов, время рендеринга шаблонов и размер ответа.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes', type=int, default=settings.METRICS_WINDOW_MINUTES,
+            help='Окно в минутах, не больше METRICS_WINDOW_MINUTES.'
+        )
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        minutes = min(options['minutes'], settings.METRICS_WINDOW_MINUTES)
+        data = snapshot(minutes)
+        if options['json']:
+            self.stdout.write(json.dumps(data, ensure_ascii=False, indent=2))
+            return
+        if not data:
+            self.stdout.write(f'Нет замеров за {minutes} мин.')
+            return
+        header = f'{"":<12}' + ''.join(f'{name:>10}' for name in COLUMNS)
+        for view_name, summary in data.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view_name}: {summary["requests"]} запросов'
+            ))
+            self.stdout.write(header)
+            for name in METRICS:
+                if name in summary:
+                    self.stdout.write(f'{name:<12}' + ''.join(
+                        f'{summary[name][column]:>10.2f}'
+                        for column in COLUMNS
+                    ))
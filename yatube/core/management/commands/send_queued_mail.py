@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками через одно соединение '
+            'на пачку; неудачные повторяются позже.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Писем в пачке (QUEUED_EMAIL_BATCH_SIZE).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Не завершаться, ждать новые письма.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Пауза между проверками очереди, секунд.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено {sent}, с ошибкой {failed}.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: отправлено {total_sent}, с ошибкой {total_failed}.'
+        ))
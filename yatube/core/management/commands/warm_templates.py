@@ -0,0 +1,66 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+
+from core.warmup import template_names, warm_templates
+
+BENCHMARK_ROUNDS = 200
+
+
+def make_backend(cached):
+    params = dict(settings.TEMPLATES[0], NAME='benchmark')
+    params.pop('BACKEND')
+    options = params['OPTIONS'] = dict(params.get('OPTIONS', {}))
+    params['APP_DIRS'] = False
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    options['loaders'] = loaders
+    return DjangoTemplates(params)
+
+
+def time_loads(backend, names, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            backend.get_template(name)
+    return (time.perf_counter() - started) / rounds / len(names)
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны проекта; с --benchmark сравнивает '
+            'загрузку шаблона без кеша и через cached.Loader.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--benchmark', action='store_true')
+        parser.add_argument('--rounds', type=int, default=BENCHMARK_ROUNDS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        warmed = warm_templates()
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {len(warmed)} за '
+            f'{(time.perf_counter() - started) * 1000:.1f} мс'
+        ))
+        if options['benchmark']:
+            self.benchmark(options['rounds'])
+
+    def benchmark(self, rounds):
+        plain, cached = make_backend(cached=False), make_backend(cached=True)
+        names = template_names(plain)
+        time_loads(cached, names, 1)
+        plain_time = time_loads(plain, names, rounds)
+        cached_time = time_loads(cached, names, rounds)
+        self.stdout.write(
+            f'Загрузка шаблона без кеша: {plain_time * 1e6:.1f} мкс\n'
+            f'Загрузка через cached.Loader: {cached_time * 1e6:.1f} мкс\n'
+            f'Экономия на каждый шаблон страницы: '
+            f'{(plain_time - cached_time) * 1e6:.1f} мкс '
+            f'(страница ленты загружает base.html, header, footer, '
+            f'posts.html и paginator)'
+        )
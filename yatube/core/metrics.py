@@ -0,0 +1,203 @@
+"""Метрики запросов по view: скользящие гистограммы в кеше.
+
+Каждый замеренный запрос увеличивает счётчики корзин гистограмм в
+интервале длиной METRICS_SLOT_MINUTES. Кеш METRICS_CACHE_ALIAS общий
+для всех процессов (проверка core.E002): в Redis и Memcached cache.incr
+атомарен, файловый кеш при гонке может потерять единичное приращение.
+Ключи живут METRICS_WINDOW_MINUTES минут и исчезают сами.
+"""
+import collections
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+PREFIX = 'query-metrics:'
+# Метрика и множитель, переводящий её в целые единицы хранения.
+METRICS = {
+    'queries': 1,
+    'sql_ms': 1000,
+    'render_ms': 1000,
+    'size_kb': 1024,
+}
+# Верхние границы корзин в целых единицах: ряд 1-2-5 до 5·10⁹.
+BOUNDS = (0,) + tuple(
+    base * 10 ** power for power in range(10) for base in (1, 2, 5)
+)
+
+_local = threading.local()
+
+
+def metrics_cache():
+    return caches[settings.METRICS_CACHE_ALIAS]
+
+
+def bucket(value):
+    """Номер корзины, в которую попадает целое значение."""
+    for index, bound in enumerate(BOUNDS):
+        if value <= bound:
+            return index
+    return len(BOUNDS) - 1
+
+
+class Sample:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.size = None
+
+    def values(self):
+        values = {
+            'queries': self.queries,
+            'sql_ms': self.sql_time * 1000,
+            'render_ms': self.render_time * 1000,
+        }
+        if self.size is not None:
+            values['size_kb'] = self.size / 1024
+        return values
+
+
+def _timed_execute(sample):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            sample.queries += 1
+            sample.sql_time += time.perf_counter() - started
+    return wrapper
+
+
+@contextmanager
+def collect(sample):
+    """Считает запросы к базе и время рендеринга шаблонов в sample."""
+    _local.sample = sample
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(_timed_execute(sample))
+                )
+            yield sample
+    finally:
+        _local.sample = None
+
+
+def add_render_time(seconds):
+    sample = getattr(_local, 'sample', None)
+    if sample is not None:
+        sample.render_time += seconds
+
+
+def _slot(timestamp=None):
+    length = settings.METRICS_SLOT_MINUTES * 60
+    return int((timestamp or time.time()) // length)
+
+
+def _increment(cache, key, delta, timeout):
+    if not cache.add(key, delta, timeout):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Ключ истёк между add и incr.
+            cache.set(key, delta, timeout)
+
+
+def _register(cache, slot, view_name, timeout):
+    """Добавляет view в список интервала; редкую потерю при гонке
+    процессов исправит следующий запрос к той же view."""
+    key = f'{PREFIX}{slot}:views'
+    views = cache.get(key) or set()
+    if view_name not in views:
+        cache.set(key, views | {view_name}, timeout)
+
+
+def record(view_name, sample):
+    cache = metrics_cache()
+    slot = _slot()
+    timeout = (settings.METRICS_WINDOW_MINUTES
+               + settings.METRICS_SLOT_MINUTES) * 60
+    _register(cache, slot, view_name, timeout)
+    base = f'{PREFIX}{slot}:{view_name}:'
+    _increment(cache, base + 'requests', 1, timeout)
+    for name, value in sample.values().items():
+        value = int(round(value * METRICS[name]))
+        _increment(cache, f'{base}{name}:sum', value, timeout)
+        _increment(cache, f'{base}{name}:{bucket(value)}', 1, timeout)
+
+
+def percentile(histogram, total, fraction):
+    """Верхняя граница корзины, в которую попадает доля fraction."""
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= total * fraction:
+            return BOUNDS[index]
+    return BOUNDS[-1]
+
+
+def _histogram_keys(base):
+    yield base + 'requests'
+    for name in METRICS:
+        yield f'{base}{name}:sum'
+        yield from (f'{base}{name}:{index}' for index in range(len(BOUNDS)))
+
+
+def snapshot(minutes=None):
+    """Сводка по view за последние minutes минут с точностью до
+    интервала METRICS_SLOT_MINUTES.
+
+    Возвращает {view_name: {'requests': n, metric: {'count', 'mean',
+    'p50', 'p95', 'p99'}}}; значения метрик в их собственных единицах.
+    Читаются только ключи интервалов, в которых view была замерена.
+    """
+    cache = metrics_cache()
+    minutes = minutes or settings.METRICS_WINDOW_MINUTES
+    current = _slot()
+    slots = -(-minutes // settings.METRICS_SLOT_MINUTES)
+    registries = cache.get_many(
+        f'{PREFIX}{slot}:views'
+        for slot in range(current - slots + 1, current + 1)
+    )
+    bases = collections.defaultdict(list)
+    for key, views in registries.items():
+        slot = key[len(PREFIX):].split(':', 1)[0]
+        for view_name in views:
+            bases[view_name].append(f'{PREFIX}{slot}:{view_name}:')
+    found = cache.get_many([
+        key for view_bases in bases.values() for base in view_bases
+        for key in _histogram_keys(base)
+    ])
+    return {
+        view_name: _summary(found, bases[view_name])
+        for view_name in sorted(bases)
+    }
+
+
+def _summary(found, bases):
+    summary = {'requests': sum(
+        found.get(base + 'requests', 0) for base in bases
+    )}
+    for name, scale in METRICS.items():
+        histogram = [
+            sum(found.get(f'{base}{name}:{index}', 0) for base in bases)
+            for index in range(len(BOUNDS))
+        ]
+        count = sum(histogram)
+        if not count:
+            continue
+        total = sum(found.get(f'{base}{name}:sum', 0) for base in bases)
+        summary[name] = {
+            'count': count,
+            'mean': total / count / scale,
+            'p50': percentile(histogram, count, 0.5) / scale,
+            'p95': percentile(histogram, count, 0.95) / scale,
+            'p99': percentile(histogram, count, 0.99) / scale,
+        }
+    return summary
@@ -0,0 +1,26 @@
+import random
+
+from django.conf import settings
+
+from . import metrics
+
+
+class QueryMetricsMiddleware:
+    """Замеряет долю METRICS_SAMPLE_RATE запросов и пишет метрики по
+    имени view: число и время SQL-запросов, время рендеринга шаблонов
+    и размер ответа."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        with metrics.collect(metrics.Sample()) as sample:
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            if not response.streaming:
+                sample.size = len(response.content)
+            metrics.record(match.view_name, sample)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_queued_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='claim_token',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Метка захвата'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди на отправку (core.mail)."""
+    payload = models.TextField(verbose_name='Письмо в JSON')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Дата постановки')
+    # Очередь читается по индексу: письма, время попытки которых пришло.
+    next_attempt_at = models.DateTimeField(default=timezone.now,
+                                           db_index=True,
+                                           verbose_name='Следующая попытка')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попыток')
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+    # Метка обработчика, забравшего письмо последним.
+    claim_token = models.CharField(max_length=32, blank=True,
+                                   verbose_name='Метка захвата')
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self) -> str:
+        return f'{self.pk}: попыток {self.attempts}'
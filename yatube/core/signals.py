@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_sqlite_pragmas(connection):
+    # Курсор DB-API, а не Django: PRAGMA не должны попадать в счётчики
+    # запросов view (query_budget, core.metrics).
+    connection.ensure_connection()
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS:
+        apply_sqlite_pragmas(connection)
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Закрывает постоянные соединения, которые перестали отвечать.
+
+    Аналог CONN_HEALTH_CHECKS из Django 4.1: следующий запрос к базе
+    откроет новое соединение вместо ошибки на оборванном.
+    """
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is not None
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
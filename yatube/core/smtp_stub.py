@@ -0,0 +1,96 @@
+"""Минимальный SMTP-сервер для тестов почты.
+
+Понимает HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP и QUIT, складывает
+принятые письма в messages и считает соединения. fail_next задаёт,
+сколько следующих писем отклонить временной ошибкой 451.
+
+    with SMTPStub() as smtp:
+        with override_settings(EMAIL_PORT=smtp.port): ...
+"""
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.connections += 1
+        self.reply('220 localhost SMTP stub')
+        envelope = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode().strip().partition(' ')
+            command = command.upper()
+            if command in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                envelope = (argument.partition(':')[2].strip('<> '), [])
+                self.reply('250 OK')
+            elif command == 'RCPT' and envelope is not None:
+                envelope[1].append(argument.partition(':')[2].strip('<> '))
+                self.reply('250 OK')
+            elif command == 'DATA' and envelope is not None:
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.reply(stub.accept(envelope, self.read_data()))
+                envelope = None
+            elif command in ('RSET', 'NOOP'):
+                envelope = None if command == 'RSET' else envelope
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        for line in self.rfile:
+            if line in (b'.\r\n', b'.\n'):
+                break
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        return b''.join(lines)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPStub:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+        self.server = _Server((host, port), _Handler)
+        self.server.stub = self
+        self.host, self.port = self.server.server_address
+
+    def accept(self, envelope, data):
+        with self.lock:
+            if self.fail_next:
+                self.fail_next -= 1
+                return '451 Try again later'
+            self.messages.append((envelope[0], envelope[1], data))
+        return '250 Queued'
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
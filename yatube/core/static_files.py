@@ -0,0 +1,130 @@
+"""Раздача статики из STATIC_ROOT на уровне WSGI, до Django.
+
+Список файлов читается при старте процесса. Если клиент принимает
+br или gzip и при сборке появилась сжатая копия (core.storage), отдаётся
+она. Файлы с хешем в имени из манифеста кешируются клиентами навсегда
+(immutable), остальные — ненадолго, с проверкой по ETag.
+"""
+import json
+import mimetypes
+import os
+from wsgiref.util import FileWrapper
+
+from django.utils.http import http_date, parse_http_date_safe
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MANIFEST_NAME = 'staticfiles.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+BLOCK_SIZE = 64 * 1024
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip().partition('q=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (mimetypes.guess_type(path)[0]
+                             or 'application/octet-stream')
+        stat = os.stat(path)
+        self.last_modified = int(stat.st_mtime)
+        self.variants = {None: (path, stat.st_size)}
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                self.variants[encoding] = (
+                    path + suffix, os.path.getsize(path + suffix))
+
+    def variant(self, accepted):
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return None
+
+    def etag(self, encoding):
+        _, size = self.variants[encoding]
+        suffix = f'-{encoding}' if encoding else ''
+        return f'"{self.last_modified:x}-{size:x}{suffix}"'
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка: пути под prefix из root, остальное — приложению."""
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix
+        self.files = self.scan(root)
+
+    def scan(self, root):
+        immutable = set()
+        try:
+            with open(os.path.join(root, MANIFEST_NAME)) as file:
+                immutable.update(json.load(file)['paths'].values())
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, names in os.walk(root):
+            for filename in names:
+                path = os.path.join(directory, filename)
+                if filename.endswith(suffixes) and os.path.exists(
+                        path.rsplit('.', 1)[0]):
+                    continue
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[self.prefix + name] = StaticFile(
+                    path, name in immutable)
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None or environ['REQUEST_METHOD'] not in (
+                'GET', 'HEAD'):
+            return self.application(environ, start_response)
+        encoding = static_file.variant(
+            accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING', '')))
+        path, size = static_file.variants[encoding]
+        etag = static_file.etag(encoding)
+        headers = [
+            ('Content-Type', static_file.content_type),
+            ('Cache-Control',
+             IMMUTABLE if static_file.immutable else REVALIDATE),
+            ('ETag', etag),
+            ('Last-Modified', http_date(static_file.last_modified)),
+        ]
+        if len(static_file.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if self.not_modified(environ, static_file, etag):
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(size)))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(open(path, 'rb'), BLOCK_SIZE)
+
+    @staticmethod
+    def not_modified(environ, static_file, etag):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            tags = {tag.strip().replace('W/', '', 1)
+                    for tag in if_none_match.split(',')}
+            return etag in tags or '*' in tags
+        since = parse_http_date_safe(
+            environ.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return since is not None and static_file.last_modified <= since
@@ -0,0 +1,61 @@
+"""Хранилище статики с хешами в именах и сжатыми копиями файлов.
+
+collectstatic кладёт рядом с каждым текстовым файлом копии .gz и .br
+(пакет Brotli из requirements.txt; без него копии .br не создаются).
+Сжатие выполняется один раз при сборке, core.static_files отдаёт
+готовые копии по Accept-Encoding.
+"""
+import gzip
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.ico', '.txt', '.html',
+                '.json', '.xml')
+# Копия сохраняется, только если она заметно меньше исходного файла.
+MAX_RATIO = 0.9
+
+
+def gzip_compress(data):
+    # gzip.compress принимает mtime только с Python 3.8; нулевое время
+    # делает копию воспроизводимой между сборками.
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=9,
+                       mtime=0) as file:
+        file.write(data)
+    return buffer.getvalue()
+
+
+def compressors():
+    yield '.gz', gzip_compress
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                yield from self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) > len(data) * MAX_RATIO:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+            yield name, name + suffix, True
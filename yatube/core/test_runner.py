@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class YatubeTestRunner(DiscoverRunner):
+    """Тесты падают на превышении бюджета запросов view и не пишут
+    замеры в общий кеш метрик."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._saved_settings = (
+            settings.QUERY_BUDGET_STRICT, settings.METRICS_SAMPLE_RATE
+        )
+        settings.QUERY_BUDGET_STRICT = True
+        settings.METRICS_SAMPLE_RATE = 0
+
+    def teardown_test_environment(self, **kwargs):
+        (settings.QUERY_BUDGET_STRICT,
+         settings.METRICS_SAMPLE_RATE) = self._saved_settings
+        super().teardown_test_environment(**kwargs)
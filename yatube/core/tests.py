@@ -0,0 +1,447 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from email.mime.text import MIMEText
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.mail import (
+    EmailMessage, EmailMultiAlternatives, send_mail
+)
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings
+)
+
+from posts.models import Group, Post
+
+from . import benchmark
+from .checks import (
+    check_metrics_cache, check_page_cache, check_static_references
+)
+from .decorators import QueryBudgetExceeded, query_budget
+from .mail import claim, deliver, deserialize
+from .metrics import BOUNDS, METRICS, bucket, metrics_cache, snapshot
+from .models import QueuedEmail
+from .signals import apply_sqlite_pragmas
+from .smtp_stub import SMTPStub
+from .storage import brotli
+from .static_files import StaticFilesApplication
+from .warmup import warm_templates
+
+
+class WarmTemplatesTest(SimpleTestCase):
+    def test_all_project_templates_compile(self):
+        """Все шаблоны проекта загружаются и компилируются"""
+        warmed = warm_templates()
+        for name in ('base.html', 'includes/posts.html', 'posts/index.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, warmed)
+
+    def test_benchmark_reports_savings(self):
+        """Бенчмарк сравнивает загрузку шаблонов с кешем и без"""
+        out = StringIO()
+        call_command('warm_templates', benchmark=True, rounds=1, stdout=out)
+        self.assertIn('cached.Loader', out.getvalue())
+
+
+class SqlitePragmasTest(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_are_applied(self):
+        """PRAGMA из настроек применяются к соединению SQLite"""
+        apply_sqlite_pragmas(connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+
+@query_budget(1)
+def count_users(request):
+    return HttpResponse(get_user_model().objects.count())
+
+
+@query_budget(1)
+def count_users_twice(request):
+    get_user_model().objects.count()
+    return HttpResponse(get_user_model().objects.count())
+
+
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_view_within_budget(self):
+        """View в пределах бюджета отвечает как обычно"""
+        self.assertEqual(count_users(self.request).content, b'0')
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_view_over_budget_fails(self):
+        """Превышение бюджета в строгом режиме бросает исключение"""
+        with self.assertRaises(QueryBudgetExceeded):
+            count_users_twice(self.request)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_view_over_budget_logs_warning(self):
+        """Без строгого режима превышение только пишется в лог"""
+        with self.assertLogs('core.decorators', 'WARNING'):
+            count_users_twice(self.request)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'metrics': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'metrics'},
+})
+class QueryMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics_cache().clear()
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_request_is_recorded_per_view(self):
+        """Замер запроса попадает в гистограммы своей view"""
+        response = self.client.get(reverse('posts:index'))
+        summary = snapshot()['posts:index']
+        self.assertEqual(summary['requests'], 1)
+        self.assertGreater(summary['queries']['mean'], 0)
+        self.assertGreater(summary['render_ms']['mean'], 0)
+        self.assertAlmostEqual(summary['size_kb']['mean'],
+                               len(response.content) / 1024, places=2)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_recorded(self):
+        """Запросы вне выборки не замеряются"""
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(snapshot(), {})
+
+    def test_bucket_bounds(self):
+        """Значение попадает в первую корзину, не меньшую его"""
+        self.assertEqual(BOUNDS[bucket(0)], 0)
+        self.assertEqual(BOUNDS[bucket(3)], 5)
+        self.assertEqual(BOUNDS[bucket(10 ** 12)], BOUNDS[-1])
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_command_prints_views(self):
+        """Команда выводит метрики замеренных view"""
+        self.client.get(reverse('posts:index'))
+        out = StringIO()
+        call_command('query_metrics', stdout=out)
+        self.assertIn('posts:index: 1', out.getvalue())
+
+    def test_snapshot_reads_only_recorded_slots(self):
+        """Сводка не запрашивает ключи пустых интервалов"""
+        with override_settings(METRICS_SAMPLE_RATE=1):
+            self.client.get(reverse('posts:index'))
+        requested = []
+        get_many = metrics_cache().get_many
+
+        def counting_get_many(keys):
+            keys = list(keys)
+            requested.append(len(keys))
+            return get_many(keys)
+
+        with mock.patch.object(metrics_cache(), 'get_many',
+                               counting_get_many):
+            snapshot()
+        self.assertEqual(
+            requested, [12, 1 + len(METRICS) * (len(BOUNDS) + 1)]
+        )
+
+    def test_local_metrics_cache_is_rejected(self):
+        """Проверка не пропускает кеш метрик в памяти процесса"""
+        with override_settings(METRICS_SAMPLE_RATE=0.05):
+            errors = check_metrics_cache(None)
+        self.assertEqual([error.id for error in errors], ['core.E002'])
+        with override_settings(METRICS_SAMPLE_RATE=0):
+            self.assertEqual(check_metrics_cache(None), [])
+
+
+class PageCacheCheckTest(SimpleTestCase):
+    def test_local_page_cache_is_rejected_on_deploy(self):
+        """check --deploy не пропускает кеш страниц в памяти процесса"""
+        errors = check_page_cache(None)
+        self.assertEqual([error.id for error in errors], ['core.E003'])
+        with override_settings(PAGE_CACHE_ALIAS='metrics'):
+            self.assertEqual(check_page_cache(None), [])
+
+
+class BenchmarkTest(TestCase):
+    def test_command_refuses_non_bench_database(self):
+        """Вне профиля bench прогон не трогает базу без --force"""
+        with self.assertRaisesMessage(CommandError, '--force'):
+            call_command('benchmark', stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_seed_creates_dataset_with_counters(self):
+        """Заполнение создаёт посты и пересчитывает счётчики"""
+        benchmark.seed(posts=30, users=3, groups=2, batch_size=7)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(
+            sum(Group.objects.values_list('posts_count', flat=True)),
+            Post.objects.filter(group__isnull=False).count()
+        )
+
+    def test_percentiles(self):
+        """Перцентили считаются по отсортированным замерам"""
+        values = [i / 100 for i in range(100, 0, -1)]
+        summary = benchmark.summarize(values, 2, [1, 3], errors=0)
+        self.assertAlmostEqual(summary['p50_ms'], 500)
+        self.assertAlmostEqual(summary['p99_ms'], 990)
+        self.assertEqual(summary['rps'], 50)
+        self.assertEqual(summary['queries'], 2)
+
+    def test_compare_reports_regressions(self):
+        """Сравнение находит рост p95 и числа запросов"""
+        baseline = {'index': {'p95_ms': 10.0, 'queries': 2.0}}
+        self.assertEqual(benchmark.compare(
+            {'index': {'p95_ms': 11.0, 'queries': 2.0}}, baseline, 0.2
+        ), [])
+        regressions = benchmark.compare(
+            {'index': {'p95_ms': 20.0, 'queries': 4.0}}, baseline, 0.2
+        )
+        self.assertEqual(len(regressions), 2)
+
+
+class StaticFilesTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        with override_settings(STATIC_ROOT=cls.root, STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage')):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as file:
+            cls.hashed = json.load(file)['paths']['css/bootstrap.min.css']
+        cls.app = StaticFilesApplication(
+            lambda environ, start_response: [b'django'], cls.root,
+            '/static/'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def get(self, path, **environ):
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(
+            {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', **environ},
+            start_response,
+        ))
+        return response.get('status'), response.get('headers'), body
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """collectstatic сохраняет gzip-копии текстовых файлов"""
+        path = os.path.join(self.root, self.hashed)
+        with open(path, 'rb') as original, gzip.open(path + '.gz') as copy:
+            self.assertEqual(copy.read(), original.read())
+        self.assertFalse(os.path.exists(
+            os.path.join(self.root, 'img', 'logo.png.gz')))
+
+    def test_serves_compressed_hashed_file_as_immutable(self):
+        """Файл с хешем отдаётся сжатым и с Cache-Control: immutable"""
+        status, headers, body = self.get(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', headers['Cache-Control'])
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+
+    @skipUnless(brotli, 'пакет Brotli не установлен')
+    def test_prefers_brotli_copy(self):
+        """Клиент с поддержкой br получает копию .br"""
+        path = os.path.join(self.root, self.hashed)
+        with open(path, 'rb') as original, open(path + '.br', 'rb') as copy:
+            self.assertEqual(brotli.decompress(copy.read()), original.read())
+        _, headers, _ = self.get('/static/' + self.hashed,
+                                 HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(headers['Content-Encoding'], 'br')
+
+    def test_respects_accept_encoding(self):
+        """Без поддержки gzip клиент получает исходный файл"""
+        for accept in ('', 'gzip;q=0, identity'):
+            with self.subTest(accept=accept):
+                _, headers, body = self.get(
+                    '/static/' + self.hashed, HTTP_ACCEPT_ENCODING=accept)
+                self.assertNotIn('Content-Encoding', headers)
+                self.assertEqual(len(body), os.path.getsize(
+                    os.path.join(self.root, self.hashed)))
+
+    def test_not_modified(self):
+        """Повторный запрос с ETag получает 304 без тела"""
+        _, headers, _ = self.get('/static/' + self.hashed)
+        status, _, body = self.get('/static/' + self.hashed,
+                                   HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual((status, body), ('304 Not Modified', b''))
+
+    def test_unhashed_and_unknown_paths(self):
+        """Имя без хеша кешируется ненадолго, прочее уходит в Django"""
+        _, headers, _ = self.get('/static/css/bootstrap.min.css')
+        self.assertNotIn('immutable', headers['Cache-Control'])
+        self.assertEqual(self.get('/static/missing.css')[2], b'django')
+        self.assertEqual(self.get('/about/author/')[2], b'django')
+
+
+class StaticReferencesCheckTest(SimpleTestCase):
+    def test_project_templates_pass(self):
+        """Все {% static %} в шаблонах проекта находятся"""
+        self.assertEqual(check_static_references(None), [])
+
+    def test_missing_and_relative_references_are_reported(self):
+        """Отсутствующий файл — ошибка, относительный путь — предупреждение"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'broken.html'), 'w') as file:
+            file.write("{% load static %}<img src=\"{% static 'no.png' %}\">"
+                       '<link rel="icon" href="img/fav.ico">')
+        templates = [{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'DIRS': [directory],
+        }]
+        with override_settings(TEMPLATES=templates):
+            messages = check_static_references(None)
+        self.assertEqual({message.id for message in messages},
+                         {'core.E001', 'core.W001'})
+
+
+@override_settings(EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+                   QUEUED_EMAIL_BACKEND=(
+                       'django.core.mail.backends.smtp.EmailBackend'),
+                   EMAIL_HOST='127.0.0.1')
+class QueuedEmailTest(TestCase):
+    def setUp(self):
+        self.smtp = SMTPStub().start()
+        self.addCleanup(self.smtp.stop)
+        patcher = override_settings(EMAIL_PORT=self.smtp.port)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def queue(self, count):
+        for number in range(count):
+            send_mail(f'Письмо {number}', 'Текст', 'from@example.com',
+                      [f'user{number}@example.com'])
+
+    def test_password_reset_is_queued_not_sent(self):
+        """Сброс пароля только ставит письмо в очередь"""
+        get_user_model().objects.create_user(
+            username='reader', email='reader@example.com', password='pass')
+        response = self.client.post(reverse('users:password_reset'),
+                                    {'email': 'reader@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(self.smtp.messages, [])
+        call_command('send_queued_mail', stdout=StringIO())
+        self.assertEqual(self.smtp.messages[0][1], ['reader@example.com'])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_batch_reuses_one_connection(self):
+        """Пачка писем уходит через одно соединение"""
+        self.queue(3)
+        self.assertEqual(deliver(), (3, 0))
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+
+    def test_failed_message_is_retried_later(self):
+        """Отклонённое письмо остаётся в очереди и уходит повторно"""
+        self.queue(2)
+        self.smtp.fail_next = 1
+        self.assertEqual(deliver(), (1, 1))
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('451', email.last_error)
+        self.assertEqual(deliver(), (0, 0))
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver(), (1, 0))
+        self.assertEqual(len(self.smtp.messages), 2)
+
+    def test_unreachable_server_and_attempt_limit(self):
+        """Недоступный сервер тратит попытку, исчерпанные не берутся"""
+        self.queue(1)
+        self.smtp.stop()
+        self.assertEqual(deliver(), (0, 1))
+        QueuedEmail.objects.update(
+            next_attempt_at=timezone.now(),
+            attempts=settings.QUEUED_EMAIL_MAX_ATTEMPTS)
+        self.assertEqual(deliver(), (0, 0))
+
+    def test_broken_message_does_not_block_batch(self):
+        """Письмо, которое нельзя собрать, не мешает остальным"""
+        self.queue(1)
+        send_mail('Тема\nс переводом строки', 'Текст', 'from@example.com',
+                  ['broken@example.com'])
+        QueuedEmail.objects.create(payload='{"subject": ')
+        self.queue(1)
+        with self.assertLogs('core.mail', 'ERROR'):
+            self.assertEqual(deliver(), (2, 2))
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(
+            set(QueuedEmail.objects.values_list('attempts', flat=True)),
+            {settings.QUEUED_EMAIL_MAX_ATTEMPTS})
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver(), (0, 0))
+
+    def test_message_survives_queue(self):
+        """Из очереди уходит то же письмо с альтернативой и вложением"""
+        message = EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            cc=['cc@example.com'], headers={'X-Yatube': '1'})
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('notes.txt', 'Заметки', 'text/plain')
+        message.send()
+        restored = deserialize(QueuedEmail.objects.get().payload)
+        self.assertEqual(restored.recipients(), message.recipients())
+        self.assertEqual(restored.alternatives, message.alternatives)
+        self.assertEqual(restored.extra_headers, {'X-Yatube': '1'})
+        self.assertEqual(restored.attachments, message.attachments)
+
+    def test_message_keeps_subtypes_encoding_and_mime_parts(self):
+        """Подтипы, кодировка и MIME-вложения переживают очередь"""
+        message = EmailMessage('Тема', '<p>Текст</p>', 'from@example.com',
+                               ['to@example.com'])
+        message.content_subtype = 'html'
+        message.mixed_subtype = 'related'
+        message.encoding = 'koi8-r'
+        message.attach(MIMEText('Часть', 'plain', 'utf-8'))
+        message.send()
+        restored = deserialize(QueuedEmail.objects.get().payload)
+        self.assertEqual(
+            (restored.content_subtype, restored.mixed_subtype,
+             restored.encoding), ('html', 'related', 'koi8-r'))
+        parts = restored.message().get_payload()
+        self.assertEqual(parts[0].get_content_type(), 'text/html')
+        self.assertEqual(parts[0].get_content_charset(), 'koi8-r')
+        self.assertEqual(parts[1].get_payload(decode=True).decode(),
+                         'Часть')
+
+    def test_concurrent_claims_do_not_overlap(self):
+        """Письмо, которое забрал другой обработчик, не отправляется"""
+        self.queue(3)
+        new_token = uuid.uuid4
+        stolen = []
+
+        def racing_token():
+            # Другой обработчик забирает письма между выбором и UPDATE.
+            if not stolen:
+                stolen.append(None)
+                stolen[0] = claim(10)
+            return new_token()
+
+        with mock.patch('core.mail.uuid.uuid4', racing_token):
+            self.assertEqual(claim(10), [])
+        self.assertEqual(len(stolen[0]), 3)
@@ -0,0 +1,33 @@
+import os
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+
+def template_names(backend):
+    """Имена всех .html-шаблонов, которые видит бэкенд."""
+    dirs = list(backend.dirs) + list(get_app_template_dirs('templates'))
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith('.html'):
+                    path = os.path.join(root, filename)
+                    names.add(os.path.relpath(path, directory))
+    return sorted(name.replace(os.sep, '/') for name in names)
+
+
+def warm_templates():
+    """Загружает и компилирует все шаблоны, чтобы заполнить cached.Loader.
+
+    Вызывается в рабочем процессе при старте: кеш загрузчика живёт
+    в памяти процесса, который обслуживает запросы.
+    """
+    warmed = []
+    for backend in engines.all():
+        if isinstance(backend, DjangoTemplates):
+            for name in template_names(backend):
+                backend.get_template(name)
+                warmed.append(name)
+    return warmed
@@ -1,22 +1,81 @@
 from django.contrib import admin
+from django.db import connections
 
 from .models import Group, Post
+from .paginators import CachedCountPaginator
+from .search import matching_post_ids
 
 
-class PostAdmin(admin.ModelAdmin):
+# Верхняя граница префикса: больше любой строки, которая с него начинается
+# при двоичном сравнении.
+PREFIX_END = '\U0010ffff'
+
+
+class CachedCountAdminMixin:
+    """Количество строк списка из кеша или оценки СУБД, без второго
+    COUNT(*) по всей таблице при фильтрации и поиске."""
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return CachedCountPaginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+
+class PostAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request,
+                                                     **kwargs)
+        if db_field.name == 'group' and request is not None:
+            # Список групп читается один раз на запрос, а не для
+            # каждой строки list_editable.
+            choices = getattr(request, 'post_admin_group_choices', None)
+            if choices is None:
+                choices = list(formfield.choices)
+                request.post_admin_group_choices = choices
+            formfield.choices = choices
+        return formfield
 
-class GroupAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'slug', 'description',)
-    search_fields = ('title')
-    list_filter = ('slug')
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по обратному индексу вместо LIKE по тексту."""
+        if not search_term:
+            return queryset, False
+        post_ids = matching_post_ids(search_term)
+        if post_ids is None:
+            return queryset.none(), False
+        return queryset.filter(pk__in=post_ids), False
+
+
+class GroupAdmin(CachedCountAdminMixin, admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'description', 'posts_count',)
+    search_fields = ('title',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по началу названия без учёта регистра по индексу title_key.
+
+        LIKE в SQLite не читает индекс с двоичным сравнением, зато
+        диапазон по нему точен; в остальных СУБД LIKE 'префикс%' читает
+        индекс, а диапазон зависел бы от правил сортировки.
+        """
+        prefix = search_term.strip().casefold()
+        if not prefix:
+            return queryset, False
+        if connections[queryset.db].vendor == 'sqlite':
+            return queryset.filter(title_key__gte=prefix,
+                                   title_key__lt=prefix + PREFIX_END), False
+        return queryset.filter(title_key__startswith=prefix), False
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,161 @@
+"""Кеш целых страниц для анонимных посетителей.
+
+Запись в кеше хранит ответ и версии областей (scopes), от которых он
+зависит: 'index', 'post:<id>', 'author:<id>', 'group:<id>'. Запись
+поста или группы увеличивает версии только своих областей, и при
+следующем чтении устаревшие страницы просто не совпадают по версиям.
+Нужны только get/set/get_many/add/incr, поэтому подходит любой бэкенд
+кеша: locmem, файловый или Redis.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control
+)
+from django.utils.http import parse_http_date_safe
+from django.views.decorators.http import condition
+
+VERSION_PREFIX = 'page-cache-version:'
+PAGE_PREFIX = 'page-cache:'
+
+
+def page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def _initial_version():
+    # Версия от времени не совпадёт со старой, если ключ версии вытеснен.
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    cache = page_cache()
+    keys = {VERSION_PREFIX + scope: scope for scope in scopes}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, _initial_version(), None)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate(*scopes):
+    """Сбрасывает страницы, зависящие от любой из областей."""
+    cache = page_cache()
+    for scope in set(scopes):
+        key = VERSION_PREFIX + scope
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def post_scopes(post):
+    scopes = [f'post:{post.pk}', f'author:{post.author_id}']
+    if post.group_id is not None:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+def depend_on(request, *scopes):
+    """Отмечает, что кешируемая страница зависит от областей."""
+    versions = getattr(request, 'page_cache_versions', None)
+    if versions is not None:
+        versions.update(get_versions(set(scopes) - versions.keys()))
+
+
+def depend_on_posts(request, posts):
+    """Страница показывает посты: зависит от их авторов и групп."""
+    scopes = set()
+    for post in posts:
+        scopes.add(f'author:{post.author_id}')
+        if post.group_id is not None:
+            scopes.add(f'group:{post.group_id}')
+    depend_on(request, *scopes)
+
+
+def cache_anonymous_page(view):
+    """Отдаёт анонимным посетителям сохранённую страницу, пока не
+    изменилась ни одна из областей, от которых она зависит."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        cache = page_cache()
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'{PAGE_PREFIX}{view.__module__}.{view.__name__}:{path}'
+        entry = cache.get(key)
+        if entry is not None:
+            versions, response = entry
+            if get_versions(versions) == versions:
+                # Проверка ETag по сохранённому ответу, без запросов.
+                return get_conditional_response(
+                    request, etag=response.get('ETag'),
+                    last_modified=parse_http_date_safe(
+                        response.get('Last-Modified', '')),
+                    response=response,
+                )
+        request.page_cache_versions = {}
+        response = view(request, *args, **kwargs)
+        if (response.status_code == 200 and not response.streaming
+                and not response.cookies):
+            cache.set(key, (request.page_cache_versions, response),
+                      settings.PAGE_CACHE_TIMEOUT)
+        return response
+    return wrapper
+
+
+def conditional_page(last_modified):
+    """Отвечает 304 без рендеринга, если страница не менялась.
+
+    last_modified(request, *args, **kwargs) возвращает время изменения
+    страницы одним запросом к отслеживаемым полям или None и может
+    записать в request.page_scopes области страницы. ETag учитывает ещё
+    версии этих областей, чтобы изменения без записи в базу (готовые
+    превью картинок) тоже обновляли страницу, и вошедшего пользователя:
+    шапка и кнопки страницы зависят от него. Вошедшим Last-Modified не
+    отдаётся, чтобы клиент, проверяющий только дату, не получил 304 на
+    чужую версию страницы.
+    """
+    def modified(request, *args, **kwargs):
+        if not hasattr(request, 'page_last_modified'):
+            request.page_last_modified = last_modified(
+                request, *args, **kwargs)
+        return request.page_last_modified
+
+    def get_last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return modified(request, *args, **kwargs)
+
+    def get_etag(request, *args, **kwargs):
+        value = modified(request, *args, **kwargs)
+        if value is None:
+            return None
+        versions = get_versions(getattr(request, 'page_scopes', ()))
+        raw = ':'.join((value.isoformat(), str(request.user.pk or 0), *(
+            f'{scope}={version}' for scope, version in sorted(
+                versions.items())
+        )))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def decorator(view):
+        conditional = condition(etag_func=get_etag,
+                                last_modified_func=get_last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # Без no-cache браузер сам решил бы, сколько считать копию
+            # свежей, и не спрашивал бы сервер.
+            patch_cache_control(
+                response, no_cache=True,
+                private=request.user.is_authenticated,
+            )
+            return response
+        return wrapper
+    return decorator
@@ -1 +1,4 @@
 MAX_POST_TEXT_LENGTH = 15
+# Сколько номеров страниц показывать вокруг текущей и у краёв
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
@@ -0,0 +1,79 @@
+import collections
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def change_author_count(stats_model, post_model, author_id, delta):
+    """Сдвигает счётчик автора; отсутствующую строку пересчитывает."""
+    updated = stats_model.objects.filter(author_id=author_id).update(
+        posts_count=F('posts_count') + delta
+    )
+    # Строку создаём только при добавлении: при удалении автора
+    # его статистика могла быть уже удалена каскадом.
+    if not updated and delta > 0:
+        stats_model.objects.get_or_create(
+            author_id=author_id,
+            defaults={'posts_count': post_model.objects.filter(
+                author_id=author_id).count()},
+        )
+
+
+def change_group_count(group_model, group_id, delta):
+    if group_id is not None:
+        group_model.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta
+        )
+
+
+def change_followers_count(stats_model, post_model, follow_model,
+                           author_id, delta):
+    """Сдвигает счётчик подписчиков; отсутствующую строку пересчитывает."""
+    updated = stats_model.objects.filter(author_id=author_id).update(
+        followers_count=F('followers_count') + delta
+    )
+    if not updated and delta > 0:
+        stats_model.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': post_model.objects.filter(
+                    author_id=author_id).count(),
+                'followers_count': follow_model.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+
+
+def recount(stats_model, group_model, post_model, follow_model=None):
+    """Пересчитывает все счётчики по таблицам постов и подписок.
+
+    Без follow_model считаются только посты. Режим чтения лент
+    (timeline_pull) у авторов сохраняется.
+    """
+    per_group = post_model.objects.filter(
+        group=OuterRef('pk')
+    ).order_by().values('group').annotate(total=Count('pk')).values('total')
+    per_author = post_model.objects.order_by().values('author').annotate(
+        total=Count('pk')
+    )
+    with transaction.atomic():
+        group_model.objects.update(
+            posts_count=Coalesce(Subquery(per_group), 0)
+        )
+        stats = collections.defaultdict(dict)
+        for row in per_author.iterator():
+            stats[row['author']]['posts_count'] = row['total']
+        if follow_model is not None:
+            per_followed = follow_model.objects.order_by().values(
+                'author').annotate(total=Count('pk'))
+            for row in per_followed.iterator():
+                stats[row['author']]['followers_count'] = row['total']
+            for author_id in stats_model.objects.filter(
+                    timeline_pull=True).values_list('author_id', flat=True):
+                stats[author_id]['timeline_pull'] = True
+        stats_model.objects.all().delete()
+        stats_model.objects.bulk_create(
+            stats_model(author_id=author_id, **fields)
+            for author_id, fields in stats.items()
+        )
@@ -0,0 +1,79 @@
+"""Потоковая выгрузка постов в CSV и JSONL.
+
+Посты читаются через iterator(chunk_size): в памяти держится одна
+пачка строк, а не весь queryset, поэтому расход памяти не зависит от
+размера таблицы.
+"""
+import csv
+import datetime
+import json
+
+from django.utils import timezone
+
+from .models import Post
+
+CHUNK_SIZE = 2000
+FIELDS = ('id', 'pub_date', 'author', 'group', 'group_title', 'text')
+
+
+def export_queryset(since=None, until=None, group=None):
+    """Посты с автором и группой; since и until — даты включительно."""
+    queryset = Post.objects.select_related('author', 'group').only(
+        'text', 'pub_date', 'author__username', 'group__slug',
+        'group__title',
+    ).order_by('pk')
+    # Границы дня вместо __date, чтобы фильтр читался по индексу.
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=_day_start(since))
+    if until is not None:
+        queryset = queryset.filter(
+            pub_date__lt=_day_start(until + datetime.timedelta(days=1))
+        )
+    if group is not None:
+        queryset = queryset.filter(group__slug=group)
+    return queryset
+
+
+def _day_start(date):
+    return timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time.min)
+    )
+
+
+def rows(queryset, chunk_size=CHUNK_SIZE):
+    for post in queryset.iterator(chunk_size=chunk_size):
+        group = post.group
+        yield {
+            'id': post.pk,
+            'pub_date': post.pub_date.isoformat(),
+            'author': post.author.username,
+            'group': group.slug if group else None,
+            'group_title': group.title if group else None,
+            'text': post.text,
+        }
+
+
+class _Line:
+    """Файлоподобный объект: csv.writer пишет в него строку и
+    получает её обратно."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow([row[field] for field in FIELDS])
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_lines),
+    'jsonl': ('application/x-ndjson; charset=utf-8', jsonl_lines),
+}
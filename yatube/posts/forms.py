@@ -1,13 +1,31 @@
 from django import forms
 
+from .export import FORMATS
 from .models import Post
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         labels = {'text': 'Введите текст',
-                  'group': 'Выберите группу'}
+                  'group': 'Выберите группу',
+                  'image': 'Картинка'}
         help_texts = {'text': 'Что тебя беспокоит?',
-                      'group': 'К какой группе отнесем пост?'}
+                      'group': 'К какой группе отнесем пост?',
+                      'image': 'Превью появится через несколько секунд'}
+
+
+class ExportForm(forms.Form):
+    """Параметры выгрузки постов; даты включительно."""
+    format = forms.ChoiceField(choices=[(name, name) for name in FORMATS],
+                               required=False)
+    since = forms.DateField(required=False)
+    until = forms.DateField(required=False)
+    group = forms.SlugField(required=False)
+
+    def clean_format(self):
+        return self.cleaned_data['format'] or 'csv'
+
+    def clean_group(self):
+        return self.cleaned_data['group'] or None
@@ -0,0 +1,223 @@
+"""Пакетный импорт постов из CSV и JSONL.
+
+Формат совпадает с выгрузкой posts.export: author (username), group
+(slug), group_title, text и необязательный pub_date. Файл читается
+потоком, строки проверяются правилами PostForm и вставляются пачками
+bulk_create. После каждой пачки в файл контрольной точки пишется номер
+следующей записи, и повторный запуск продолжает с него. Обрыв между
+фиксацией пачки и записью точки повторит при возобновлении одну пачку.
+Битая строка JSONL, запись не-объект, невозможная дата или неверный
+slug группы отклоняют только эту запись с номером её строки в файле.
+
+Несколько процессов делят записи по номеру: процесс k из n берёт
+записи с номером i, для которых i % n == k.
+"""
+import csv
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .forms import PostForm
+from .models import Group, Post, User
+from .seeding import explicit_dates
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+GROUP_TITLE_LENGTH = Group._meta.get_field('title').max_length
+
+
+def guess_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_records(path, file_format):
+    """Пары (номер строки, запись) без чтения файла целиком.
+
+    Строки JSONL отдаются неразобранными: их разбирает Importer, чтобы
+    битая строка отклонялась, а не прерывала импорт.
+    """
+    with open(path, encoding='utf-8', newline='') as file:
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            reader.fieldnames  # читает заголовок
+            line = reader.line_num + 1
+            for record in reader:
+                yield line, record
+                line = reader.line_num + 1
+            return
+        for line, text in enumerate(file, 1):
+            if text.strip():
+                yield line, text
+
+
+def checkpoint_path(path, worker, workers):
+    suffix = f'.{worker}-of-{workers}' if workers > 1 else ''
+    return f'{path}.checkpoint{suffix}'
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)['next']
+    except FileNotFoundError:
+        return 0
+
+
+def save_checkpoint(path, next_record):
+    # Запись через временный файл: обрыв не оставит битую точку.
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump({'next': next_record}, file)
+    os.replace(temporary, path)
+
+
+class Importer:
+    """Проверяет записи и копит пачку постов для вставки."""
+
+    text_field = PostForm.base_fields['text']
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.authors = {}
+        self.groups = {}
+        # Авторы и группы вставленных постов: их страницы устарели.
+        self.author_ids = set()
+        self.group_ids = set()
+        self.pending = []
+        self.imported = 0
+        self.invalid = 0
+        self.errors = []
+
+    def add(self, line, record):
+        try:
+            record = self.parse(record)
+            text = self.text_field.clean(record.get('text'))
+            username = self.string(record, 'author').strip()
+            if not username:
+                raise ValidationError('Не указан автор.')
+            slug = self.string(record, 'group')
+            if slug:
+                validate_slug(slug)
+            pub_date = self.pub_date(self.string(record, 'pub_date'))
+        except ValidationError as error:
+            self.reject(line, '; '.join(error.messages))
+            return
+        self.pending.append((line, username, slug or None,
+                             self.string(record, 'group_title'), text,
+                             pub_date))
+
+    @staticmethod
+    def parse(record):
+        """Словарь записи; строку JSONL разбирает сам."""
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                raise ValidationError('Строка не разбирается как JSON.')
+        if not isinstance(record, dict):
+            raise ValidationError('Запись должна быть объектом.')
+        return record
+
+    @staticmethod
+    def string(record, name):
+        value = record.get(name) or ''
+        if not isinstance(value, str):
+            raise ValidationError(f'Поле {name} должно быть строкой.')
+        return value
+
+    @staticmethod
+    def pub_date(value):
+        if not value:
+            return timezone.now()
+        try:
+            pub_date = parse_datetime(value)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise ValidationError('Неверная дата публикации.')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def reject(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'строка {line}: {message}')
+
+    def resolve(self):
+        """Дополняет словари авторов и групп одним запросом на пачку."""
+        usernames = {row[1] for row in self.pending} - self.authors.keys()
+        if usernames:
+            self.authors.update(User.objects.filter(
+                username__in=usernames
+            ).values_list('username', 'pk'))
+        titles = {row[2]: row[3] for row in self.pending if row[2]}
+        slugs = titles.keys() - self.groups.keys()
+        if slugs:
+            # ignore_conflicts: ту же группу может создать другой процесс.
+            Group.objects.bulk_create((
+                Group(slug=slug, title=(titles[slug] or slug)[
+                    :GROUP_TITLE_LENGTH], description='')
+                for slug in slugs
+            ), ignore_conflicts=True)
+            self.groups.update(Group.objects.filter(
+                slug__in=slugs
+            ).values_list('slug', 'pk'))
+
+    def flush(self):
+        self.resolve()
+        posts = []
+        for line, username, slug, _, text, pub_date in self.pending:
+            if username not in self.authors:
+                self.reject(line, f'автор {username} не найден.')
+                continue
+            posts.append(Post(
+                text=text, author_id=self.authors[username],
+                group_id=self.groups.get(slug), pub_date=pub_date,
+                updated_at=pub_date,
+            ))
+        with transaction.atomic(), explicit_dates(Post):
+            Post.objects.bulk_create(posts)
+        self.imported += len(posts)
+        self.author_ids.update(post.author_id for post in posts)
+        self.group_ids.update(post.group_id for post in posts
+                              if post.group_id is not None)
+        self.pending = []
+
+
+def import_file(path, file_format, worker=0, workers=1,
+                batch_size=BATCH_SIZE, restart=False):
+    """Импортирует долю файла процесса worker из workers.
+
+    Возвращает словарь с числом вставленных и отклонённых записей,
+    первыми сообщениями об ошибках и id затронутых авторов и групп.
+    """
+    checkpoint = checkpoint_path(path, worker, workers)
+    start = 0 if restart else load_checkpoint(checkpoint)
+    importer = Importer(batch_size)
+    next_record = start
+    records = enumerate(read_records(path, file_format))
+    for number, (line, record) in records:
+        if number < start or number % workers != worker:
+            continue
+        importer.add(line, record)
+        next_record = number + 1
+        if len(importer.pending) >= batch_size:
+            importer.flush()
+            save_checkpoint(checkpoint, next_record)
+    if importer.pending:
+        importer.flush()
+    save_checkpoint(checkpoint, max(next_record, start))
+    return {
+        'imported': importer.imported,
+        'invalid': importer.invalid,
+        'errors': importer.errors,
+        'author_ids': importer.author_ids,
+        'group_ids': importer.group_ids,
+        'resumed_from': start,
+    }
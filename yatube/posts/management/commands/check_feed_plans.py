@@ -0,0 +1,77 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from posts.models import Post, TimelineEntry
+from posts.paginators import KEYSET_ORDERING, NEXT, PREVIOUS, seek
+from posts.views import POST_OBJ
+
+# Признаки полного прохода по таблице и отдельной сортировки в плане.
+PLAN_MARKERS = {
+    'sqlite': (
+        r'\bSCAN (TABLE )?{table}\b(?!.*\bINDEX\b)',
+        r'TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY',
+    ),
+    'postgresql': (
+        r'Seq Scan on {table}\b',
+        r'^\s*(->\s*)?Sort\b',
+    ),
+}
+
+
+def feed_querysets():
+    """Запросы страниц лент в том виде, в каком их выполняют views."""
+    feeds = {
+        'posts:index': Post.objects.for_feed(),
+        'posts:group_list': Post.objects.group_feed(0),
+        'posts:profile': Post.objects.for_feed().filter(author_id=0),
+    }
+    now = timezone.now()
+    for name, queryset in feeds.items():
+        yield name, queryset.order_by(*KEYSET_ORDERING)
+        for direction in (NEXT, PREVIOUS):
+            yield (f'{name} cursor={direction}',
+                   seek(queryset, direction, now, 0))
+    # Лента подписок (posts.timeline) читает ключи постов из своей таблицы.
+    timeline = TimelineEntry.objects.filter(user_id=0).values_list(
+        'pub_date', 'post_id')
+    yield 'posts:follow_index', timeline.order_by('-pub_date', '-post_id')
+    for direction in (NEXT, PREVIOUS):
+        yield (f'posts:follow_index cursor={direction}',
+               seek(timeline, direction, now, 0, pk_field='post_id'))
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов лент и завершается с ошибкой, '
+            'если какой-то из них читает всю таблицу или сортирует '
+            'строки вместо чтения по индексу.')
+
+    def handle(self, *args, **options):
+        markers = PLAN_MARKERS.get(connection.vendor)
+        if markers is None:
+            raise CommandError(
+                f'Проверка планов для {connection.vendor} не поддерживается.'
+            )
+        failed = []
+        for name, queryset in feed_querysets():
+            table = re.escape(queryset.model._meta.db_table)
+            full_scan, sort = (
+                re.compile(marker.format(table=table), re.MULTILINE)
+                for marker in markers
+            )
+            plan = queryset[:POST_OBJ + 1].explain()
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}:\n{plan}')
+            if full_scan.search(plan) or sort.search(plan):
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: полный проход или сортировка\n{plan}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        if failed:
+            raise CommandError(
+                'Запросы без подходящего индекса: ' + ', '.join(failed)
+            )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from posts.export import CHUNK_SIZE, FORMATS, export_queryset, rows
+
+
+def date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты с автором и группой в CSV или JSONL, '
+            'не загружая таблицу в память целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout.')
+        parser.add_argument('--since', type=date,
+                            help='Дата ГГГГ-ММ-ДД, включительно.')
+        parser.add_argument('--until', type=date,
+                            help='Дата ГГГГ-ММ-ДД, включительно.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(options['since'], options['until'],
+                                   options['group'])
+        _, lines = FORMATS[options['format']]
+        lines = lines(rows(queryset, options['chunk_size']))
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
@@ -0,0 +1,72 @@
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.counters import recount
+from posts.importing import BATCH_SIZE, guess_format, import_file
+from posts.models import AuthorStats, Follow, Group, Post, PostSearchTerm
+from posts.search import build_index
+from posts.signals import pages_written
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты из CSV или JSONL в формате export_posts: '
+            'пачками bulk_create, с контрольной точкой для продолжения '
+            'после сбоя и параллельными процессами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'jsonl'))
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Процессов; при продолжении должно совпадать с прошлым '
+                 'запуском.'
+        )
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать сначала, игнорируя контрольную '
+                                 'точку.')
+
+    def handle(self, *args, **options):
+        path, workers = options['path'], options['workers']
+        if workers < 1:
+            raise CommandError('--workers должно быть не меньше 1.')
+        run = functools.partial(
+            import_file, path, options['format'] or guess_format(path),
+            workers=workers, batch_size=options['batch_size'],
+            restart=options['restart'],
+        )
+        started = time.perf_counter()
+        if workers == 1:
+            results = [run(0)]
+        else:
+            # Дочерние процессы открывают свои соединения с базой.
+            connections.close_all()
+            with ProcessPoolExecutor(workers,
+                                     initializer=django.setup) as executor:
+                results = list(executor.map(run, range(workers)))
+        elapsed = time.perf_counter() - started
+        imported = sum(result['imported'] for result in results)
+        invalid = sum(result['invalid'] for result in results)
+        for result in results:
+            if result['resumed_from']:
+                self.stdout.write(
+                    f'Продолжено с записи {result["resumed_from"]}.'
+                )
+            for error in result['errors']:
+                self.stderr.write(error)
+        recount(AuthorStats, Group, Post, Follow)
+        # bulk_create не отправляет сигналы, индексируем новые посты сами.
+        build_index(PostSearchTerm, Post, missing_only=True)
+        pages_written(
+            set().union(*(result['author_ids'] for result in results)),
+            set().union(*(result['group_ids'] for result in results)),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, отклонено: {invalid}, '
+            f'{imported / elapsed:.0f} строк/с.'
+        ))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post, PostSearchTerm
+from posts.search import INDEX_BATCH_SIZE, build_index
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает поисковый индекс постов; с --missing '
+            'индексирует только посты без записей в индексе, например '
+            'после bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true')
+        parser.add_argument('--batch-size', type=int,
+                            default=INDEX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = build_index(PostSearchTerm, Post, options['missing'],
+                              options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed} за {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount
+from posts.models import AuthorStats, Follow, Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов авторов и групп.'
+
+    def handle(self, *args, **options):
+        recount(AuthorStats, Group, Post, Follow)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано: авторов {AuthorStats.objects.count()}, '
+            f'групп {Group.objects.count()}.'
+        ))
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import seeding
+from posts.counters import recount
+from posts.models import AuthorStats, Follow, Group, Post
+from posts.signals import pages_written
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу пользователями, группами и постами пачками '
+            'bulk_create: авторы и группы по закону Ципфа, даты постов '
+            'распределены за --days дней.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк в одной транзакции.'
+        )
+        parser.add_argument('--prefix', default='seed',
+                            help='Префикс имён пользователей и slug групп.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        author_ids = self.timed('Пользователи', options['users'],
+                                seeding.seed_users, options['users'],
+                                options['prefix'], batch_size)
+        group_ids = self.timed('Группы', options['groups'],
+                               seeding.seed_groups, options['groups'],
+                               options['prefix'], batch_size)
+        if not author_ids:
+            self.stdout.write('Нет авторов, посты не созданы.')
+            return
+        self.timed('Посты', options['posts'], seeding.seed_posts,
+                   options['posts'], author_ids, group_ids,
+                   options['days'], batch_size)
+        self.timed('Счётчики', None, recount, AuthorStats, Group, Post,
+                   Follow)
+        # bulk_create не отправляет сигналы: сбрасываем страницы сами.
+        pages_written(author_ids, group_ids)
+
+    def timed(self, label, rows, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+        message = f'{label}: {elapsed:.2f} с'
+        if rows:
+            message += f', {rows / elapsed:.0f} строк/с'
+        self.stdout.write(self.style.SUCCESS(message))
+        return result
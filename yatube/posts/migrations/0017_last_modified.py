@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='last_modified',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения страницы'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-17 08:35
+
+from django.db import migrations, models
+import posts.models
+
+
+def fill_title_keys(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    groups = list(Group.objects.only('pk', 'title'))
+    for group in groups:
+        group.title_key = group.title.casefold()[:200]
+    Group.objects.bulk_update(groups, ['title_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='title_key',
+            field=posts.models.FoldedCharField(db_index=True, default='', max_length=200, source='title', verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(fill_title_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='group',
+            name='title',
+            field=models.CharField(max_length=200, verbose_name='Название'),
+        ),
+    ]
@@ -1,15 +1,56 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from posts.constants import MAX_POST_TEXT_LENGTH
 
 User = get_user_model()
 
 
+class FoldedCharField(models.CharField):
+    """Копия поля source без учёта регистра (str.casefold).
+
+    Значение пересчитывается при каждой записи, в том числе в
+    bulk_create, поэтому по нему можно искать без функций в запросе.
+    """
+
+    def __init__(self, *args, source, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.source).casefold()
+        value = value[:self.max_length]
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название')
+    # Индекс для поиска групп по началу названия в админке; в PostgreSQL
+    # Django добавляет к нему индекс varchar_pattern_ops для LIKE.
+    title_key = FoldedCharField(max_length=200, source='title',
+                                db_index=True, default='',
+                                verbose_name='Название для поиска')
     slug = models.SlugField(unique=True, verbose_name='Идентификатор')
     description = models.TextField(verbose_name='Описание')
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество постов'
+    )
+    # Время последнего изменения страницы группы (posts.caching).
+    last_modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -19,12 +60,32 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа одним запросом, только нужные
+        шаблонам поля."""
+        return self.select_related(
+            'author', 'author__stats', 'group'
+        ).only(
+            'text', 'pub_date', 'updated_at', 'image', 'author', 'group',
+            'author__username', 'author__first_name', 'author__last_name',
+            'author__stats__profile_updated_at',
+            'group__slug', 'group__title',
+        )
+
+    def group_feed(self, group):
+        """Лента группы: читается по индексу post_group_feed_idx."""
+        return self.for_feed().filter(group=group)
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст',
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации'
                                     )
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -41,10 +102,160 @@ class Post(models.Model):
         help_text='Выберите группу для поста'
     )
 
+    image = models.ImageField(
+        upload_to='posts/',
+        blank=True,
+        verbose_name='Картинка',
+        help_text='Загрузите картинку'
+    )
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        # Порядок полей повторяет сортировку лент (posts.paginators),
+        # чтобы каждая лента читалась по индексу без отдельной сортировки.
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_feed_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_feed_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_feed_idx'),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self) -> str:
         return self.text[:MAX_POST_TEXT_LENGTH]
+
+
+class AuthorStats(models.Model):
+    """Счётчики автора, которые обновляются при записи постов."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
+    profile_updated_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата изменения профиля'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+    # Время последнего изменения профиля, постов или подписчиков автора.
+    last_modified = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата изменения страницы'
+    )
+    # Посты автора подмешиваются в ленты при чтении (posts.timeline).
+    timeline_pull = models.BooleanField(
+        default=False,
+        verbose_name='Лента без рассылки'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self) -> str:
+        return f'{self.author}: {self.posts_count}'
+
+    @classmethod
+    def posts_count_for(cls, author_id):
+        return cls.objects.filter(author_id=author_id).values_list(
+            'posts_count', flat=True
+        ).first() or 0
+
+
+class PostSearchTerm(models.Model):
+    """Запись обратного индекса поиска: основа слова и её вес в посте."""
+    term = models.CharField(max_length=64, verbose_name='Основа слова')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Пост'
+    )
+    weight = models.FloatField(verbose_name='Доля слова в тексте')
+
+    class Meta:
+        # Уникальный индекс (term, post) обслуживает и поиск по основам.
+        constraints = (
+            models.UniqueConstraint(fields=('term', 'post'),
+                                    name='post_search_term_unique'),
+        )
+        verbose_name = 'Основа слова в посте'
+        verbose_name_plural = 'Поисковый индекс'
+
+    def __str__(self) -> str:
+        return f'{self.term}: {self.post_id}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='follow_unique'),
+            models.CheckConstraint(check=~models.Q(user=models.F('author')),
+                                   name='follow_not_self'),
+        )
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+
+    def __str__(self) -> str:
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, записанный при публикации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    # Копия даты поста: лента сортируется без обращения к постам.
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='timeline_entry_unique'),
+        )
+        indexes = (
+            models.Index(fields=('user', '-pub_date', '-post'),
+                         name='timeline_feed_idx'),
+        )
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+
+    def __str__(self) -> str:
+        return f'{self.user}: {self.post_id}'
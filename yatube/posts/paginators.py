@@ -0,0 +1,262 @@
+import collections.abc
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from posts.constants import PAGE_RANGE_ON_EACH_SIDE, PAGE_RANGE_ON_ENDS
+
+NEXT = 'n'
+PREVIOUS = 'p'
+CURSOR_SEPARATOR = '|'
+KEYSET_ORDERING = ('-pub_date', '-id')
+
+
+def encode_cursor(direction, post):
+    """Упаковывает ключ (pub_date, id) поста в непрозрачный токен."""
+    raw = CURSOR_SEPARATOR.join(
+        (direction, post.pub_date.isoformat(), str(post.pk))
+    )
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(token):
+    """Возвращает (direction, pub_date, id) или None для битого токена."""
+    try:
+        raw = urlsafe_base64_decode(token).decode()
+        direction, pub_date, pk = raw.split(CURSOR_SEPARATOR)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+def seek(queryset, direction, pub_date, pk, pk_field='id'):
+    """Записи строго после ключа в направлении обхода, по порядку обхода.
+
+    pk_field — поле с id поста, если queryset не по самим постам.
+    """
+    if direction == NEXT:
+        return queryset.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, **{f'{pk_field}__lt': pk})
+        ).order_by('-pub_date', f'-{pk_field}')
+    return queryset.filter(
+        Q(pub_date__gt=pub_date)
+        | Q(pub_date=pub_date, **{f'{pk_field}__gt': pk})
+    ).order_by('pub_date', pk_field)
+
+
+class KeysetPage(collections.abc.Sequence):
+    """Страница курсорной пагинации: знает только соседние курсоры.
+
+    Запрос к базе выполняется при первом обращении к содержимому.
+    """
+
+    def __init__(self, paginator, queryset, direction, from_cursor):
+        self.paginator = paginator
+        self._queryset = queryset
+        self._direction = direction
+        self._from_cursor = from_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of %s objects>' % len(self.object_list)
+
+    @cached_property
+    def _window(self):
+        """Строки страницы и признаки наличия следующей и предыдущей."""
+        rows, more = self._fetch(self._queryset)
+        if self._direction == NEXT:
+            return rows, more, self._from_cursor
+        if not rows:
+            # Перед курсором ничего не осталось: показываем начало ленты.
+            rows, more = self._fetch(self.paginator.first())
+            return rows, more, False
+        return rows[::-1], True, more
+
+    def _fetch(self, queryset):
+        """Не больше per_page строк и признак того, что есть ещё."""
+        per_page = self.paginator.per_page
+        rows = list(queryset[:per_page + 1])
+        return rows[:per_page], len(rows) > per_page
+
+    @property
+    def object_list(self):
+        return self._window[0]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._window[1] and bool(self.object_list)
+
+    def has_previous(self):
+        return self._window[2] and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(NEXT, self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(PREVIOUS, self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """Пагинация по ключу (pub_date, id) вместо LIMIT/OFFSET.
+
+    Порядок совпадает с Post.Meta.ordering, id разрешает совпадения дат.
+    Стоимость любой страницы одинакова и не зависит от её глубины,
+    общее количество записей не считается.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, cursor):
+        """Возвращает страницу по токену; битый токен ведёт на первую."""
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return KeysetPage(self, self.first(), NEXT, from_cursor=False)
+        direction, pub_date, pk = decoded
+        return KeysetPage(self, self.after(direction, pub_date, pk),
+                          direction, from_cursor=True)
+
+    def first(self):
+        """Записи с начала ленты."""
+        return self.object_list.order_by(*KEYSET_ORDERING)
+
+    def after(self, direction, pub_date, pk):
+        """Записи после ключа курсора в направлении обхода."""
+        return seek(self.object_list, direction, pub_date, pk)
+
+
+class FeedPage(Page):
+    """Нумерованная страница, соседние страницы открываются по курсору."""
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(NEXT, self[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(PREVIOUS, self[0])
+        return None
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator без COUNT(*) на каждый запрос.
+
+    Количество берётся из переданного счётчика, иначе из кеша, куда
+    попадает оценка СУБД или результат COUNT(*). Кешированное значение
+    может отставать не больше чем на PAGINATOR_COUNT_TIMEOUT секунд.
+    """
+
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        if self._known_count is not None:
+            return self._known_count
+        key = self._cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = self._estimate_count()
+            if count is None:
+                count = super().count
+            cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def page(self, number):
+        # Срез не обрезается по count: устаревшее количество влияет
+        # только на номера страниц, но не на их содержимое.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if number == self.num_pages:
+            top += self.orphans
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1,
+                              on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+                              on_ends=PAGE_RANGE_ON_ENDS):
+        """Номера страниц у краёв и вокруг текущей, пропуски — ELLIPSIS.
+
+        Длина диапазона не зависит от количества страниц.
+        """
+        number = self.validate_number(number)
+        last = self.num_pages
+        if last <= (on_each_side + on_ends) * 2 + 1:
+            yield from self.page_range
+            return
+        left = number - on_each_side
+        right = number + on_each_side
+        if left > on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+        else:
+            left = 1
+        if right < last - on_ends - 1:
+            yield from range(left, right + 1)
+            yield self.ELLIPSIS
+            yield from range(last - on_ends + 1, last + 1)
+        else:
+            yield from range(left, last + 1)
+
+    def _cache_key(self):
+        query = str(getattr(self.object_list, 'query', self.object_list))
+        return 'paginator-count:' + hashlib.md5(query.encode()).hexdigest()
+
+    def _estimate_count(self):
+        """Оценка из статистики PostgreSQL для таблицы без фильтров."""
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < settings.PAGINATOR_ESTIMATE_MIN_ROWS:
+            return None
+        return row[0]
@@ -0,0 +1,210 @@
+"""Полнотекстовый поиск по постам через обратный индекс в базе.
+
+Текст разбивается на слова, стоп-слова отбрасываются, остальные
+приводятся к основе (posts.stemmer) и сохраняются в PostSearchTerm с
+долей в тексте поста. Запрос находит посты со всеми основами запроса
+и ранжирует их по tf-idf одним запросом GROUP BY по индексу (term,
+post). Страницы открываются по курсору (score, id), как ленты; score
+целый, чтобы курсор сравнивался с ним точно.
+"""
+import collections
+import math
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import (
+    BigIntegerField, Case, Count, F, FloatField, Q, Sum, Value, When
+)
+from django.db.models.functions import Cast, Round
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import Post, PostSearchTerm
+from .paginators import CURSOR_SEPARATOR
+from .stemmer import stem
+
+WORD = re.compile(r'[0-9a-zа-я]+')
+MAX_TERM_LENGTH = PostSearchTerm._meta.get_field('term').max_length
+INDEX_BATCH_SIZE = 1000
+POST_COUNT_KEY = 'search-post-count'
+# Вклад основы в score округляется до целого в этих долях: сумма
+# целых не зависит от порядка сложения и точно проходит через курсор.
+SCORE_SCALE = 10 ** 6
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'был', 'была', 'были', 'было', 'быть', 'в', 'вам',
+    'вас', 'во', 'вот', 'все', 'всех', 'вы', 'где', 'да', 'для', 'до',
+    'его', 'ее', 'если', 'есть', 'еще', 'же', 'за', 'и', 'из', 'или',
+    'им', 'их', 'к', 'как', 'когда', 'кто', 'ли', 'мне', 'мы', 'на',
+    'над', 'не', 'него', 'нет', 'ни', 'но', 'ну', 'о', 'об', 'он', 'она',
+    'они', 'оно', 'от', 'по', 'под', 'при', 'про', 'с', 'со', 'так',
+    'там', 'то', 'тоже', 'только', 'тот', 'ты', 'у', 'уже', 'чем', 'что',
+    'чтобы', 'это', 'этот', 'я',
+))
+
+
+def tokenize(text):
+    """Основы значимых слов текста в порядке появления."""
+    words = WORD.findall(text.lower().replace('ё', 'е'))
+    return [stem(word)[:MAX_TERM_LENGTH] for word in words
+            if word not in STOP_WORDS]
+
+
+def term_weights(text):
+    counts = collections.Counter(tokenize(text))
+    total = sum(counts.values())
+    return {term: count / total for term, count in counts.items()}
+
+
+def index_posts(term_model, posts):
+    """Перестраивает записи индекса для постов модели term_model.
+
+    Строки вставляются одним executemany: на пост приходятся десятки
+    записей, и создание объектов модели стоило бы дороже самой вставки.
+    """
+    posts = list(posts)
+    rows = [(term, post.pk, weight) for post in posts
+            for term, weight in term_weights(post.text).items()]
+    quote = connection.ops.quote_name
+    insert = 'INSERT INTO {} ({}, {}, {}) VALUES (%s, %s, %s)'.format(
+        quote(term_model._meta.db_table), quote('term'), quote('post_id'),
+        quote('weight'),
+    )
+    with transaction.atomic():
+        term_model.objects.filter(post__in=[post.pk for post in posts]
+                                  ).delete()
+        with connection.cursor() as cursor:
+            cursor.executemany(insert, rows)
+
+
+def index_post(post):
+    index_posts(PostSearchTerm, [post])
+
+
+def build_index(term_model, post_model, missing_only=False,
+                batch_size=INDEX_BATCH_SIZE):
+    """Индексирует все посты или только ещё не проиндексированные."""
+    queryset = post_model.objects.only('text').order_by('pk')
+    if missing_only:
+        queryset = queryset.filter(search_terms__isnull=True)
+    indexed = 0
+    batch = []
+    for post in queryset.iterator(chunk_size=batch_size):
+        batch.append(post)
+        if len(batch) == batch_size:
+            index_posts(term_model, batch)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        index_posts(term_model, batch)
+        indexed += len(batch)
+    return indexed
+
+
+def encode_cursor(score, pk):
+    raw = CURSOR_SEPARATOR.join((str(score), str(pk)))
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(token):
+    try:
+        score, pk = urlsafe_base64_decode(token).decode().split(
+            CURSOR_SEPARATOR)
+        return int(score), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+class SearchPage:
+    """Страница результатов: посты по убыванию релевантности."""
+
+    def __init__(self, object_list, next_cursor=None, has_previous=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _post_count():
+    count = cache.get(POST_COUNT_KEY)
+    if count is None:
+        count = Post.objects.count()
+        cache.set(POST_COUNT_KEY, count, settings.PAGINATOR_COUNT_TIMEOUT)
+    return count
+
+
+def ranked(terms):
+    """Id постов со всеми основами и их целый score по tf-idf.
+
+    Возвращает None, если какой-то основы нет ни в одном посте.
+    """
+    frequencies = dict(PostSearchTerm.objects.filter(
+        term__in=terms
+    ).values('term').annotate(posts=Count('pk')).values_list(
+        'term', 'posts'))
+    if len(frequencies) < len(terms):
+        return None
+    total = max(_post_count(), max(frequencies.values()))
+    idf = Case(*(
+        When(term=term,
+             then=Value(math.log(1 + total / posts) * SCORE_SCALE))
+        for term, posts in frequencies.items()
+    ), output_field=FloatField())
+    contribution = Cast(Round(F('weight') * idf), BigIntegerField())
+    return PostSearchTerm.objects.filter(term__in=terms).values(
+        'post'
+    ).annotate(
+        score=Sum(contribution, output_field=BigIntegerField()),
+        matched=Count('pk'),
+    ).filter(matched=len(terms)).order_by('-score', '-post_id')
+
+
+def matching_post_ids(query):
+    """Подзапрос id постов со всеми основами запроса, без ранжирования.
+
+    Возвращает None, если в запросе нет значимых слов.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return None
+    return PostSearchTerm.objects.filter(term__in=terms).values(
+        'post'
+    ).annotate(matched=Count('pk')).filter(
+        matched=len(terms)
+    ).values('post')
+
+
+def search(query, cursor=None, per_page=10):
+    """Страница постов по запросу; курсор — из SearchPage.next_cursor."""
+    terms = set(tokenize(query))
+    decoded = decode_cursor(cursor) if cursor else None
+    results = ranked(terms) if terms else None
+    if results is None:
+        return SearchPage([], has_previous=decoded is not None)
+    if decoded is not None:
+        score, pk = decoded
+        results = results.filter(
+            Q(score__lt=score) | Q(score=score, post__lt=pk)
+        )
+    rows = list(results.values_list('post', 'score')[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.for_feed().in_bulk([pk for pk, _ in rows])
+    return SearchPage([posts[pk] for pk, _ in rows if pk in posts],
+                      next_cursor, has_previous=decoded is not None)
@@ -0,0 +1,122 @@
+"""Генерация больших наборов данных пачками bulk_create.
+
+Распределения похожи на настоящие: у немногих авторов и групп
+большая часть постов (закон Ципфа), даты публикации растут вместе с id
+и равномерно покрывают заданный период.
+"""
+import bisect
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from .models import Group, Post, User
+
+AUTHOR_EXPONENT = 1.1
+GROUP_EXPONENT = 0.8
+TEXT_POOL_SIZE = 1000
+
+
+def zipf_cumulative(count, exponent):
+    """Накопленные веса рангов 1..count по закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def pick(values, cumulative):
+    point = random.random() * cumulative[-1]
+    return values[bisect.bisect(cumulative, point)]
+
+
+@contextmanager
+def explicit_dates(model):
+    """Отключает auto_now и auto_now_add, чтобы даты задавались явно."""
+    changed = []
+    for field in model._meta.concrete_fields:
+        for flag in ('auto_now', 'auto_now_add'):
+            if getattr(field, flag, False):
+                setattr(field, flag, False)
+                changed.append((field, flag))
+    try:
+        yield
+    finally:
+        for field, flag in changed:
+            setattr(field, flag, True)
+
+
+def _bulk_create(model, objects, batch_size):
+    """Вставляет объекты транзакциями по batch_size строк.
+
+    Размер одного INSERT Django подбирает сам по ограничениям СУБД:
+    в Django 2.2 явный batch_size их не учитывает.
+    """
+    created = 0
+    while True:
+        batch = list(itertools.islice(objects, batch_size))
+        if not batch:
+            return created
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def seed_users(count, prefix, batch_size):
+    """Создаёт авторов и возвращает id всех авторов с этим префиксом."""
+    faker = Faker('ru_RU')
+    start = User.objects.filter(username__startswith=f'{prefix}_').count()
+    # Хеш одного пароля на всех: вход авторам не нужен, а хеширование
+    # каждого пароля заняло бы больше времени, чем вставка.
+    password = make_password(None)
+    _bulk_create(User, (
+        User(username=f'{prefix}_{number}', password=password,
+             first_name=faker.first_name(), last_name=faker.last_name())
+        for number in range(start, start + count)
+    ), batch_size)
+    return list(User.objects.filter(
+        username__startswith=f'{prefix}_'
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def seed_groups(count, prefix, batch_size):
+    faker = Faker('ru_RU')
+    start = Group.objects.filter(slug__startswith=f'{prefix}-').count()
+    _bulk_create(Group, (
+        Group(title=faker.sentence(nb_words=3)[:200],
+              slug=f'{prefix}-{number}', description=faker.paragraph())
+        for number in range(start, start + count)
+    ), batch_size)
+    return list(Group.objects.filter(
+        slug__startswith=f'{prefix}-'
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def seed_posts(count, author_ids, group_ids, days, batch_size,
+               ungrouped_share=0.3):
+    """Создаёт count постов, даты идут по порядку за последние days дней."""
+    faker = Faker('ru_RU')
+    texts = [faker.paragraph(nb_sentences=random.randint(1, 8))
+             for _ in range(TEXT_POOL_SIZE)]
+    authors = zipf_cumulative(len(author_ids), AUTHOR_EXPONENT)
+    groups = zipf_cumulative(len(group_ids), GROUP_EXPONENT)
+    end = timezone.now()
+    step = timedelta(days=days) / max(count, 1)
+    start = end - step * count
+
+    def posts():
+        for number in range(count):
+            date = start + step * (number + random.random())
+            group_id = None
+            if group_ids and random.random() >= ungrouped_share:
+                group_id = pick(group_ids, groups)
+            yield Post(text=random.choice(texts),
+                       author_id=pick(author_ids, authors),
+                       group_id=group_id, pub_date=date, updated_at=date)
+
+    with explicit_dates(Post):
+        return _bulk_create(Post, posts(), batch_size)
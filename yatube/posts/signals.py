@@ -0,0 +1,154 @@
+import functools
+
+from django.db import connection, transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import invalidate, post_scopes
+from .counters import (
+    change_author_count, change_followers_count, change_group_count
+)
+from .models import AuthorStats, Follow, Group, Post, User
+from .search import index_post
+from .thumbnails import schedule
+from .timeline import add_author, fan_out, remove_author, switch_to_pull
+
+
+def invalidate_pages(*scopes):
+    # Повторный сброс после коммита не даёт закешировать страницу,
+    # прочитанную другим запросом до фиксации транзакции.
+    invalidate(*scopes)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: invalidate(*scopes))
+
+
+def touch(author_ids=(), group_ids=()):
+    """Сдвигает время изменения страниц авторов и групп."""
+    now = timezone.now()
+    author_ids = {pk for pk in author_ids if pk not in (None, DEFERRED)}
+    group_ids = {pk for pk in group_ids if pk not in (None, DEFERRED)}
+    if author_ids:
+        AuthorStats.objects.filter(author_id__in=author_ids).update(
+            last_modified=now)
+    if group_ids:
+        Group.objects.filter(pk__in=group_ids).update(last_modified=now)
+
+
+def pages_written(author_ids=(), group_ids=()):
+    """Сбрасывает страницы после записи постов в обход сигналов."""
+    author_ids, group_ids = set(author_ids), set(group_ids) - {None}
+    invalidate_pages('index', *(f'author:{pk}' for pk in author_ids),
+                     *(f'group:{pk}' for pk in group_ids))
+    touch(author_ids, group_ids)
+
+
+def image_name(instance):
+    # До первого обращения в __dict__ лежит имя файла, после — FieldFile.
+    value = instance.__dict__.get('image', DEFERRED)
+    return getattr(value, 'name', value)
+
+
+def remember_counted(instance):
+    """Запоминает автора и группу, под которыми пост учтён в счётчиках."""
+    instance._counted = (instance.__dict__.get('author_id', DEFERRED),
+                         instance.__dict__.get('group_id', DEFERRED))
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    remember_counted(instance)
+    instance._indexed_text = instance.__dict__.get('text', DEFERRED)
+    instance._image_name = image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    old_author_id, old_group_id = (None, None) if created else (
+        instance._counted
+    )
+    # Отложенные поля не сохранялись, значит и не менялись.
+    if old_author_id is not DEFERRED and (
+            old_author_id != instance.author_id):
+        if old_author_id is not None:
+            change_author_count(AuthorStats, Post, old_author_id, -1)
+        change_author_count(AuthorStats, Post, instance.author_id, 1)
+    if old_group_id is not DEFERRED and old_group_id != instance.group_id:
+        change_group_count(Group, old_group_id, -1)
+        change_group_count(Group, instance.group_id, 1)
+    old_scopes = [f'{name}:{pk}' for name, pk in (
+        ('author', old_author_id), ('group', old_group_id)
+    ) if pk not in (None, DEFERRED)]
+    invalidate_pages('index', *post_scopes(instance), *old_scopes)
+    touch((instance.author_id, old_author_id),
+          (instance.group_id, old_group_id))
+    remember_counted(instance)
+    if created:
+        fan_out(instance)
+    reindex(instance, created)
+    make_thumbnails(instance, created)
+
+
+def reindex(instance, created):
+    old_text = None if created else instance._indexed_text
+    if 'text' in instance.__dict__ and old_text != instance.text:
+        # Записи индекса удаляются вместе с постом каскадом.
+        index_post(instance)
+        instance._indexed_text = instance.text
+
+
+def make_thumbnails(instance, created):
+    name = image_name(instance)
+    if name and name is not DEFERRED and name != (
+            None if created else instance._image_name):
+        # Файл картинки уже записан, превью готовятся после коммита;
+        # готовые превью сбрасывают закешированные страницы с заглушкой.
+        scopes = ('index', *post_scopes(instance))
+        transaction.on_commit(lambda: schedule(
+            name, on_ready=functools.partial(invalidate, *scopes)))
+    instance._image_name = name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(AuthorStats, Post, instance.author_id, -1)
+    change_group_count(Group, instance.group_id, -1)
+    invalidate_pages('index', *post_scopes(instance))
+    touch((instance.author_id,), (instance.group_id,))
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        change_followers_count(AuthorStats, Post, Follow,
+                               instance.author_id, 1)
+        switch_to_pull(instance.author_id)
+        add_author(instance.user_id, instance.author_id)
+        # Кнопка подписки на странице автора сменилась.
+        touch((instance.author_id,))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_followers_count(AuthorStats, Post, Follow, instance.author_id, -1)
+    remove_author(instance.user_id, instance.author_id)
+    touch((instance.author_id,))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_pages(f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login, страницы не меняются.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        # Меняет версию закешированных карточек постов автора.
+        now = timezone.now()
+        AuthorStats.objects.filter(author=instance).update(
+            profile_updated_at=now, last_modified=now
+        )
+        invalidate_pages(f'author:{instance.pk}')
@@ -0,0 +1,125 @@
+"""Стеммер русского языка по алгоритму Snowball (Портер).
+
+Отрезает окончания и суффиксы в областях RV и R2, как описано в
+https://snowballstem.org/algorithms/russian/stemmer.html. Слова
+другими буквами возвращаются без изменений.
+"""
+import functools
+
+VOWELS = frozenset('аеиоуыэюя')
+AFTER_A = frozenset('ая')
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = ((), (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = ((), (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _regions(word):
+    """Начала областей RV и R2 в слове."""
+    rv = next((i + 1 for i, char in enumerate(word) if char in VOWELS),
+              len(word))
+
+    def after_vowel_consonant(start):
+        for i in range(max(start, 1), len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    return rv, after_vowel_consonant(after_vowel_consonant(1) + 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _by_length(endings):
+    after_a, anywhere = endings
+    return tuple(sorted(after_a + anywhere, key=len, reverse=True))
+
+
+def _remove(rv, endings):
+    """Отрезает самое длинное окончание из групп (после а/я, любые).
+
+    Как в Snowball, если самое длинное совпадение из первой группы не
+    стоит после а или я, более короткие не проверяются.
+    """
+    anywhere = endings[1]
+    for ending in _by_length(endings):
+        if rv.endswith(ending):
+            if ending in anywhere:
+                return rv[:-len(ending)]
+            if len(rv) > len(ending) and rv[-len(ending) - 1] in AFTER_A:
+                return rv[:-len(ending)]
+            return None
+    return None
+
+
+def _step_one(rv):
+    """Деепричастие, иначе возвратная частица и затем прилагательное
+    (с причастием), глагол или существительное."""
+    stripped = _remove(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    reflexive = _remove(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    stripped = _remove(rv, ADJECTIVE)
+    if stripped is not None:
+        participle = _remove(stripped, PARTICIPLE)
+        return stripped if participle is None else participle
+    for endings in (VERB, NOUN):
+        stripped = _remove(rv, endings)
+        if stripped is not None:
+            return stripped
+    return rv
+
+
+def _step_four(rv):
+    """Превосходная степень, двойное н или мягкий знак."""
+    for suffix in SUPERLATIVE:
+        if rv.endswith(suffix):
+            rv = rv[:-len(suffix)]
+            return rv[:-1] if rv.endswith('нн') else rv
+    if rv.endswith('нн') or rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+# Словарь постов ограничен, поэтому основы слов кешируются.
+@functools.lru_cache(maxsize=100000)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start, r2_start = _regions(word)
+    head, rv = word[:rv_start], word[rv_start:]
+    rv = _step_one(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    # Словообразовательный суффикс снимается, только если он целиком в R2.
+    for suffix in DERIVATIONAL:
+        if rv.endswith(suffix) and (
+                rv_start + len(rv) - len(suffix) >= r2_start):
+            rv = rv[:-len(suffix)]
+            break
+    return head + _step_four(rv)
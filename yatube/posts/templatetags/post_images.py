@@ -0,0 +1,16 @@
+from django import template
+
+from posts.thumbnails import VARIANTS, thumbnail_url
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/post_image.html')
+def post_image(post, variant='small'):
+    """Превью картинки поста или заглушка, пока превью готовится."""
+    width, height = VARIANTS[variant]
+    return {
+        'url': thumbnail_url(post.image.name, variant),
+        'width': width,
+        'height': height,
+    }
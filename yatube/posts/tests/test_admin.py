@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import GroupAdmin
+from ..models import Group, Post, User
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.groups = [Group.objects.create(title=f'Группа {i}',
+                                           slug=f'group-{i}')
+                      for i in range(5)]
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.admin, text=f'Пост {i}',
+                 group=self.groups[i % len(self.groups)])
+            for i in range(count)
+        )
+
+    def count_queries(self, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка постов не зависит от числа строк"""
+        self.create_posts(3)
+        few = self.count_queries()
+        self.create_posts(20)
+        self.assertEqual(self.count_queries(), few)
+
+    def test_search_uses_index(self):
+        """Поиск в админке находит посты по формам слова"""
+        wanted = Post.objects.create(author=self.admin,
+                                     text='Кошки спят на солнце')
+        Post.objects.create(author=self.admin, text='Собака лает')
+        response = self.client.get(self.url, {'q': 'кошка'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [wanted])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'q': 'кошка'})
+        self.assertFalse(any('LIKE' in query['sql'] for query in queries))
+
+
+class GroupAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.url = reverse('admin:posts_group_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def create_groups(self, start, count):
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'group-{i}', posts_count=i)
+            for i in range(start, start + count)
+        )
+
+    def count_queries(self, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_group_admin_is_registered(self):
+        """Группы в админке настроены через GroupAdmin"""
+        self.assertIsInstance(admin.site._registry[Group], GroupAdmin)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка групп не зависит от числа строк"""
+        self.create_groups(0, 3)
+        few = self.count_queries()
+        self.create_groups(3, 20)
+        self.assertEqual(self.count_queries(), few)
+
+    def test_posts_count_column_is_sortable(self):
+        """Список групп сортируется по числу постов без COUNT по постам"""
+        self.create_groups(0, 3)
+        index = GroupAdmin.list_display.index('posts_count')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'o': f'-{index}'})
+        groups = response.context['cl'].result_list
+        self.assertEqual([group.posts_count for group in groups], [2, 1, 0])
+        self.assertFalse(any('posts_post' in query['sql']
+                             for query in queries))
+
+    def test_search_by_title_prefix(self):
+        """Поиск находит группы по началу названия в любом регистре"""
+        wanted = Group.objects.create(title='КОТики', slug='cats')
+        Group.objects.create(title='Собаки и котики', slug='dogs')
+        for term in ('Кот', 'кот', 'кОТИ'):
+            with self.subTest(term=term):
+                response = self.client.get(self.url, {'q': term})
+                self.assertEqual(
+                    list(response.context['cl'].result_list), [wanted]
+                )
+
+    def test_search_key_follows_bulk_create(self):
+        """Ключ поиска заполняется и при массовой вставке групп"""
+        self.create_groups(0, 1)
+        response = self.client.get(self.url, {'q': 'группа 0'})
+        self.assertEqual(len(response.context['cl'].result_list), 1)
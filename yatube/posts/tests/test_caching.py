@@ -0,0 +1,134 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(author=cls.author, text='Пост',
+                                       group=cls.group)
+        cls.other_post = Post.objects.create(author=cls.other,
+                                             text='Другой пост',
+                                             group=cls.other_group)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url, client=None):
+        with CaptureQueriesContext(connection) as queries:
+            (client or self.client).get(url)
+        return len(queries)
+
+    def test_anonymous_page_is_served_from_cache(self):
+        """Повторный анонимный запрос не обращается к базе"""
+        url = reverse('posts:index')
+        self.assertGreater(self.count_queries(url), 0)
+        self.assertEqual(self.count_queries(url), 0)
+
+    def test_authenticated_page_is_not_cached(self):
+        """Страницы авторизованных пользователей не кешируются"""
+        self.client.force_login(self.other)
+        url = reverse('posts:index')
+        self.count_queries(url)
+        self.assertGreater(self.count_queries(url), 0)
+
+    def test_post_write_purges_only_affected_pages(self):
+        """Новый пост сбрасывает только затронутые им страницы"""
+        affected = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        unaffected = (
+            reverse('posts:profile', kwargs={'username': 'other'}),
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.other_post.pk}),
+        )
+        for url in affected + unaffected:
+            self.client.get(url)
+        Post.objects.create(author=self.author, text='Новый пост',
+                            group=self.group)
+        for url in affected:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIsNotNone(response.context)
+        for url in unaffected:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), 0)
+
+    def test_group_write_purges_pages_showing_group(self):
+        """Изменение группы сбрасывает страницы с её постами"""
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        self.client.get(url)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertGreater(self.count_queries(url), 0)
+
+
+class FileBasedPageCacheTests(PageCacheTests):
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.cache_settings = override_settings(CACHES={
+            **settings.CACHES,
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cls.cache_dir,
+            },
+        })
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth',
+                                              first_name='Лев')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        # Авторизованному пользователю страница целиком не кешируется.
+        self.client.force_login(self.author)
+        self.url = reverse('posts:index')
+
+    def test_card_changes_with_post(self):
+        """Карточка обновляется после изменения поста"""
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(text='Тайная правка')
+        self.assertNotContains(self.client.get(self.url), 'Тайная правка')
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_card_changes_with_author(self):
+        """Карточка обновляется после изменения профиля автора"""
+        self.assertContains(self.client.get(self.url), 'Лев')
+        self.author.first_name = 'Фёдор'
+        self.author.save()
+        self.assertContains(self.client.get(self.url), 'Фёдор')
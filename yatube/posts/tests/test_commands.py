@@ -0,0 +1,48 @@
+from io import StringIO
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import AuthorStats, Group, Post
+
+
+class CheckFeedPlansCommandTests(TestCase):
+    def test_feed_queries_use_indexes(self):
+        """Запросы всех лент читаются по индексу без сортировки"""
+        out = StringIO()
+        call_command('check_feed_plans', stdout=out)
+        self.assertNotIn('сортировка', out.getvalue())
+
+
+class SeedYatubeCommandTests(TestCase):
+    def test_seed_creates_dated_posts_and_counters(self):
+        """Заполнение создаёт посты с заданными датами и счётчики"""
+        out = StringIO()
+        call_command('seed_yatube', users=5, groups=3, posts=120, days=10,
+                     batch_size=50, stdout=out)
+        self.assertEqual(Post.objects.count(), 120)
+        self.assertIn('строк/с', out.getvalue())
+        oldest = Post.objects.order_by('pub_date').first()
+        self.assertLess(oldest.pub_date,
+                        timezone.now() - timedelta(days=9))
+        self.assertEqual(oldest.updated_at, oldest.pub_date)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            120
+        )
+        self.assertEqual(
+            sum(Group.objects.values_list('posts_count', flat=True)),
+            Post.objects.filter(group__isnull=False).count()
+        )
+
+    def test_auto_dates_are_restored(self):
+        """После заполнения новые посты снова получают текущую дату"""
+        call_command('seed_yatube', users=1, groups=0, posts=1, days=100,
+                     stdout=StringIO())
+        post = Post.objects.create(author=Post.objects.get().author,
+                                   text='Новый пост')
+        self.assertGreater(post.pub_date,
+                           timezone.now() - timedelta(minutes=1))
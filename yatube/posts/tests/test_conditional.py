@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..caching import invalidate, post_scopes
+from ..models import Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='test')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(author=cls.author, text='Пост',
+                                       group=cls.group)
+        cls.urls = (
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:group_list', kwargs={'slug': 'test'}),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Повторный запрос с ETag или датой получает 304"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(self.revalidate(url, response).status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                since = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(since.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_not_modified_costs_one_query(self):
+        """Проверка без кеша страниц — один запрос и никакого рендеринга"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                # Другой адрес не найдётся в кеше страниц, а ETag тот же.
+                with self.assertNumQueries(1):
+                    revalidated = self.revalidate(url + '?fresh=1',
+                                                  response)
+                self.assertEqual(revalidated.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+
+    def test_cached_page_revalidates_without_queries(self):
+        """Страница из кеша отвечает 304 без запросов к базе"""
+        url = self.urls[0]
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(url, response).status_code,
+                             HTTPStatus.NOT_MODIFIED)
+
+    def test_post_changes_refresh_affected_pages(self):
+        """Правка поста меняет страницы поста, автора и группы"""
+        before = {url: self.client.get(url) for url in self.urls}
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        for url, response in before.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(url, response).status_code,
+                                 HTTPStatus.OK)
+
+    def test_page_scope_reset_refreshes_pages(self):
+        """Сброс областей поста (готовые превью) меняет ETag страниц"""
+        before = {url: self.client.get(url) for url in self.urls}
+        invalidate('index', *post_scopes(self.post))
+        for url, response in before.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(url, response).status_code,
+                                 HTTPStatus.OK)
+
+    def test_other_group_page_stays_valid(self):
+        """Пост в другой группе не меняет страницу этой группы"""
+        url = self.urls[2]
+        response = self.client.get(url)
+        Post.objects.create(author=self.author, text='Другой',
+                            group=self.other_group)
+        self.assertEqual(self.revalidate(url, response).status_code,
+                         HTTPStatus.NOT_MODIFIED)
+
+    def test_profile_edit_refreshes_profile(self):
+        """Смена имени автора меняет страницу его профиля"""
+        url = self.urls[1]
+        response = self.client.get(url)
+        self.author.first_name = 'Новое'
+        self.author.save()
+        self.assertEqual(self.revalidate(url, response).status_code,
+                         HTTPStatus.OK)
+
+    def test_login_changes_etag(self):
+        """Вошедший пользователь не получает 304 на анонимную версию"""
+        url = self.urls[0]
+        anonymous = self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.revalidate(url, anonymous)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.revalidate(url, response).status_code,
+                         HTTPStatus.NOT_MODIFIED)
@@ -0,0 +1,68 @@
+import csv
+import json
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post, User
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = Post.objects.create(author=cls.author, text='В группе',
+                                       group=cls.group)
+        cls.old_post = Post.objects.create(author=cls.author,
+                                           text='Старый, "с кавычками"')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        cls.url = reverse('posts:export')
+
+    def test_staff_gets_streaming_csv(self):
+        """Сотрудник получает CSV потоком"""
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        lines = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([line['text'] for line in lines],
+                         ['В группе', 'Старый, "с кавычками"'])
+        self.assertEqual(lines[0]['group'], 'group')
+        self.assertEqual(lines[0]['author'], 'auth')
+
+    def test_export_is_staff_only(self):
+        """Обычный пользователь выгрузку не получает"""
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_invalid_filter_is_rejected(self):
+        """Неверная дата в фильтре возвращает 400"""
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {'since': 'вчера'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_command_filters_by_date_and_group(self):
+        """Команда выгружает JSONL с фильтрами по дате и группе"""
+        today = timezone.localdate().isoformat()
+        out = StringIO()
+        call_command('export_posts', '--format=jsonl', f'--since={today}',
+                     stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.post.pk])
+        out = StringIO()
+        call_command('export_posts', format='jsonl', group='missing',
+                     stdout=out)
+        self.assertEqual(out.getvalue(), '')
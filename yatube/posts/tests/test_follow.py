@@ -0,0 +1,152 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+from ..paginators import NEXT, encode_cursor
+from ..views import POST_OBJ
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.follow_url = reverse('posts:profile_follow',
+                                 kwargs={'username': 'author'})
+        cls.unfollow_url = reverse('posts:profile_unfollow',
+                                   kwargs={'username': 'author'})
+        cls.index_url = reverse('posts:follow_index')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def feed(self, user=None, params=None):
+        self.client.force_login(user or self.reader)
+        response = self.client.get(self.index_url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.context['page_obj']
+
+    def test_follow_and_unfollow(self):
+        """Подписка создаётся и удаляется, счётчик подписчиков следует"""
+        response = self.client.post(self.follow_url)
+        self.assertRedirects(response, reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        self.client.post(self.follow_url)
+        self.assertEqual(Follow.objects.filter(
+            user=self.reader, author=self.author).count(), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 1)
+        self.client.post(self.unfollow_url)
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 0)
+
+    def test_follow_requires_post(self):
+        """GET не меняет подписки"""
+        for url in (self.follow_url, self.unfollow_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.METHOD_NOT_ALLOWED)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_cannot_follow_self(self):
+        """На себя подписаться нельзя"""
+        self.client.force_login(self.author)
+        self.client.post(self.follow_url)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_index_requires_login(self):
+        """Лента подписок доступна только после входа"""
+        self.client.logout()
+        response = self.client.get(self.index_url)
+        self.assertRedirects(
+            response, f"{reverse('users:login')}?next={self.index_url}")
+
+    def test_new_post_reaches_followers_only(self):
+        """Новый пост появляется в ленте подписчика и только у него"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(list(self.feed()), [post])
+        self.assertEqual(list(self.feed(self.stranger)), [])
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        """После подписки в ленте старые посты автора, после отписки нет"""
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.client.post(self.follow_url)
+        self.assertEqual(list(self.feed()), [post])
+        self.client.post(self.unfollow_url)
+        self.assertEqual(list(self.feed()), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_is_read_at_request_time(self):
+        """Посты автора с многими подписчиками подмешиваются при чтении"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        early = Post.objects.create(author=self.author, text='До порога')
+        Follow.objects.create(user=self.stranger, author=self.author)
+        self.assertTrue(
+            AuthorStats.objects.get(author=self.author).timeline_pull)
+        late = Post.objects.create(author=self.author, text='После порога')
+        self.assertFalse(TimelineEntry.objects.filter(post=late).exists())
+        self.assertEqual(list(self.feed()), [late, early])
+        self.assertEqual(list(self.feed(self.stranger)), [late, early])
+
+    def test_pages_follow_cursor(self):
+        """Лента листается курсором без пропусков и повторов"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [Post.objects.create(author=self.author, text=f'Пост {i}')
+                 for i in range(POST_OBJ + 3)]
+        first = self.feed()
+        self.assertEqual(list(first), posts[::-1][:POST_OBJ])
+        second = self.feed(params={'cursor': first.next_cursor})
+        self.assertEqual(list(second), posts[::-1][POST_OBJ:])
+        back = self.feed(params={'cursor': second.previous_cursor})
+        self.assertEqual(list(back), list(first))
+
+    def test_queries_do_not_grow_with_followed_authors(self):
+        """Число запросов ленты не зависит от числа подписок"""
+        def count_queries():
+            cache.clear()
+            cursor = encode_cursor(NEXT, Post.objects.earliest('pub_date'))
+            with CaptureQueriesContext(connection) as queries:
+                self.feed(params={'cursor': cursor})
+                self.feed()
+            return len(queries)
+
+        authors = [User.objects.create_user(username=f'author{i}')
+                   for i in range(12)]
+        for author in authors[:2]:
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(author=author, text='Пост')
+        few = count_queries()
+        for author in authors[2:]:
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(author=author, text='Пост')
+        self.assertEqual(count_queries(), few)
+        # Авторы в режиме чтения подмешиваются одним запросом на всех.
+        AuthorStats.objects.filter(author__in=authors[:2]).update(
+            timeline_pull=True)
+        pulled = count_queries()
+        AuthorStats.objects.filter(author__in=authors).update(
+            timeline_pull=True)
+        self.assertEqual(count_queries(), pulled)
+        self.assertEqual(len(self.feed()), min(len(authors), POST_OBJ))
+
+    def test_recount_keeps_followers(self):
+        """recount_stats пересчитывает и подписчиков"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        AuthorStats.objects.update(followers_count=7)
+        call_command('recount_stats', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 1)
@@ -0,0 +1,163 @@
+import io
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from .. import thumbnails
+from ..thumbnails import (
+    VARIANTS, finished, schedule, thumbnail_url, variant_name
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+PLACEHOLDER = 'img/placeholder.svg'
+
+
+def make_image(name='picture.png', size=(1600, 900)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, (200, 50, 50, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+def wait_for(check, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = check()
+        if result:
+            return result
+        time.sleep(0.05)
+    return None
+
+
+def wait_for_thumbnail(name, variant='small', timeout=10):
+    return wait_for(lambda: thumbnail_url(name, variant), timeout)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def test_post_create_saves_image(self):
+        """Пост с картинкой сохраняется через форму"""
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой', 'image': make_image('form.png'),
+        })
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.image.name.startswith('posts/form'))
+
+    def test_schedule_renders_all_variants(self):
+        """Пул процессов сжимает картинку во все варианты"""
+        name = default_storage.save('posts/variants.png', make_image())
+        self.assertIsNone(thumbnail_url(name, 'small'))
+        self.assertEqual(sorted(schedule(name).result(timeout=30)),
+                         sorted(VARIANTS))
+        for variant, bounds in VARIANTS.items():
+            with self.subTest(variant=variant):
+                path = default_storage.path(variant_name(name, variant))
+                with Image.open(path) as thumbnail:
+                    self.assertEqual(thumbnail.format, 'JPEG')
+                    self.assertLessEqual(thumbnail.width, bounds[0])
+                    self.assertLessEqual(thumbnail.height, bounds[1])
+
+    def test_thumbnail_url_found_on_disk_without_cache(self):
+        """Готовое превью находится и после потери кеша"""
+        name = default_storage.save('posts/disk.png', make_image())
+        schedule(name).result(timeout=30)
+        cache.clear()
+        self.assertEqual(thumbnail_url(name, 'large'), default_storage.url(
+            variant_name(name, 'large')))
+
+    def test_feed_shows_placeholder_until_ready(self):
+        """В ленте заглушка, пока превью не готово, затем превью"""
+        post = Post.objects.create(author=self.author, text='Картинка',
+                                   image=make_image('feed.png'))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, PLACEHOLDER)
+        schedule(post.image.name).result(timeout=30)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, PLACEHOLDER)
+        self.assertContains(response, default_storage.url(
+            variant_name(post.image.name, 'small')))
+
+    def test_broken_pool_is_replaced(self):
+        """Сломанный пул пересоздаётся при следующей задаче"""
+        name = default_storage.save('posts/broken.png', make_image())
+        broken = mock.Mock()
+        broken.submit.side_effect = thumbnails.BrokenProcessPool
+        with mock.patch.object(thumbnails, '_executor', broken):
+            future = schedule(name)
+            self.addCleanup(thumbnails._executor.shutdown)
+        broken.shutdown.assert_called_once_with(wait=False)
+        self.assertEqual(sorted(future.result(timeout=30)), sorted(VARIANTS))
+
+    def test_submit_error_is_logged(self):
+        """Ошибка постановки в очередь пишется в лог, а не падает"""
+        with mock.patch.object(thumbnails, 'submit',
+                               side_effect=RuntimeError('пул закрыт')):
+            with self.assertLogs('posts.thumbnails', 'ERROR') as logs:
+                self.assertIsNone(schedule('posts/closed.png'))
+        self.assertIn('posts/closed.png', logs.output[0])
+
+    def test_render_error_is_logged(self):
+        """Ошибка подготовки превью пишется в лог"""
+        future = Future()
+        future.set_exception(OSError('битый файл'))
+        with self.assertLogs('posts.thumbnails', 'ERROR') as logs:
+            finished('posts/broken.png', None, future)
+        self.assertIn('posts/broken.png', logs.output[0])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailOnCommitTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_thumbnails_scheduled_after_commit(self):
+        """После сохранения поста превью готовятся в фоне"""
+        author = User.objects.create_user(username='auth')
+        post = Post.objects.create(author=author, text='Картинка',
+                                   image=make_image('commit.png'))
+        # Последним пишется крупный вариант; после него каталог можно
+        # удалять.
+        self.assertIsNotNone(wait_for_thumbnail(post.image.name, 'large'))
+
+    def test_cached_anonymous_page_drops_placeholder(self):
+        """Готовое превью сбрасывает закешированную страницу анонима"""
+        author = User.objects.create_user(username='auth')
+        with mock.patch('posts.signals.schedule') as scheduled:
+            post = Post.objects.create(author=author, text='Картинка',
+                                       image=make_image('anonymous.png'))
+        self.assertContains(self.client.get(reverse('posts:index')),
+                            PLACEHOLDER)
+        _, kwargs = scheduled.call_args
+        schedule(post.image.name, **kwargs).result(timeout=30)
+        self.assertTrue(wait_for(lambda: PLACEHOLDER not in self.client.get(
+            reverse('posts:index')).content.decode()))
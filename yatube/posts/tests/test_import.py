@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..caching import get_versions
+from ..importing import import_file
+from ..models import AuthorStats, Group, Post, User
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, records, name='posts.jsonl'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return path
+
+    def test_import_validates_and_creates_groups(self):
+        """Импорт отклоняет неверные записи и создаёт новые группы"""
+        path = self.write([
+            {'author': 'auth', 'group': 'group', 'text': 'Первый',
+             'pub_date': '2020-01-02T03:04:05+00:00'},
+            {'author': 'auth', 'group': 'new', 'group_title': 'Новая',
+             'text': 'Второй'},
+            {'author': 'auth', 'text': '   '},
+            {'author': 'nobody', 'text': 'Без автора'},
+        ])
+        err = StringIO()
+        call_command('import_posts', path, stdout=StringIO(), stderr=err)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Group.objects.get(slug='new').title, 'Новая')
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(first.group, self.group)
+        self.assertEqual(AuthorStats.posts_count_for(self.author.pk), 2)
+        self.assertIn('строка 3', err.getvalue())
+        self.assertIn('nobody', err.getvalue())
+
+    def test_malformed_rows_are_rejected_with_line_numbers(self):
+        """Битые строки отклоняются по одной, импорт продолжается"""
+        path = os.path.join(self.directory, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join((
+                '{"author": "auth", "text": "Первый"}',
+                '{"author": "auth", "text": ',
+                '',
+                '["не", "объект"]',
+                '{"author": "auth", "text": "Дата",'
+                ' "pub_date": "2020-13-45T00:00:00"}',
+                '{"author": "auth", "text": "Группа", "group": "не slug"}',
+                '{"author": 7, "text": "Автор-число"}',
+                '{"author": "auth", "text": "Последний"}',
+            )) + '\n')
+        result = import_file(path, 'jsonl')
+        self.assertEqual((result['imported'], result['invalid']), (2, 5))
+        self.assertEqual(
+            [error.split(':')[0] for error in result['errors']],
+            ['строка 2', 'строка 4', 'строка 5', 'строка 6', 'строка 7']
+        )
+        self.assertFalse(Group.objects.exclude(pk=self.group.pk).exists())
+
+    def test_import_resets_author_and_group_pages(self):
+        """Импорт сбрасывает страницы авторов и групп новых постов"""
+        scopes = ('index', f'author:{self.author.pk}',
+                  f'group:{self.group.pk}')
+        versions = get_versions(scopes)
+        modified = Group.objects.get(pk=self.group.pk).last_modified
+        path = self.write([{'author': 'auth', 'group': 'group',
+                            'text': 'Пост'}])
+        call_command('import_posts', path, stdout=StringIO())
+        new_versions = get_versions(scopes)
+        for scope in scopes:
+            self.assertNotEqual(new_versions[scope], versions[scope])
+        self.assertGreater(
+            Group.objects.get(pk=self.group.pk).last_modified, modified)
+        self.assertIsNotNone(
+            AuthorStats.objects.get(author=self.author).last_modified)
+
+    def test_import_resumes_from_checkpoint(self):
+        """Повторный запуск продолжает с контрольной точки"""
+        path = self.write([{'author': 'auth', 'text': f'Пост {i}'}
+                           for i in range(5)])
+        result = import_file(path, 'jsonl', batch_size=2)
+        self.assertEqual(result['imported'], 5)
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({'author': 'auth', 'text': 'Ещё'}) + '\n')
+        result = import_file(path, 'jsonl')
+        self.assertEqual((result['resumed_from'], result['imported']), (5, 1))
+        result = import_file(path, 'jsonl', restart=True)
+        self.assertEqual(result['imported'], 6)
+
+    def test_workers_split_records(self):
+        """Процессы делят записи без пересечений"""
+        path = self.write([{'author': 'auth', 'text': f'Пост {i}'}
+                           for i in range(7)])
+        imported = [import_file(path, 'jsonl', worker, 3)['imported']
+                    for worker in range(3)]
+        self.assertEqual(imported, [3, 2, 2])
+        self.assertEqual(
+            Post.objects.values('text').distinct().count(), 7
+        )
+
+    def test_export_output_imports_back(self):
+        """Выгрузка export_posts загружается обратно"""
+        Post.objects.create(author=self.author, group=self.group,
+                            text='Текст, "с кавычками"\nи переносом')
+        path = os.path.join(self.directory, 'posts.csv')
+        call_command('export_posts', output=path)
+        Post.objects.all().delete()
+        call_command('import_posts', path, stdout=StringIO())
+        post = Post.objects.get()
+        self.assertEqual(post.text, 'Текст, "с кавычками"\nи переносом')
+        self.assertEqual(post.group, self.group)
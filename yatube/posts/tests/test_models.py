@@ -1,6 +1,9 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post, User
+from ..models import AuthorStats, Group, Post, User
 from posts.constants import MAX_POST_TEXT_LENGTH
 
 
@@ -53,3 +56,44 @@ class PostModelTest(TestCase):
             with self.subTest(value=value):
                 self.assertEqual(
                     Post._meta.get_field(value).help_text, expected)
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group1 = Group.objects.create(title='Группа 1', slug='group-1')
+        cls.group2 = Group.objects.create(title='Группа 2', slug='group-2')
+
+    def assertCounters(self, author_count, group1_count, group2_count):
+        self.group1.refresh_from_db()
+        self.group2.refresh_from_db()
+        self.assertEqual(AuthorStats.posts_count_for(self.user.pk),
+                         author_count)
+        self.assertEqual(self.group1.posts_count, group1_count)
+        self.assertEqual(self.group2.posts_count, group2_count)
+
+    def test_counters_follow_post_writes(self):
+        """Счётчики меняются при создании, смене группы и удалении поста"""
+        post = Post.objects.create(author=self.user, text='Пост',
+                                   group=self.group1)
+        Post.objects.create(author=self.user, text='Пост без группы')
+        self.assertCounters(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group2
+        post.save()
+        self.assertCounters(2, 0, 1)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertCounters(2, 0, 1)
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_recount_stats_repairs_counters(self):
+        """recount_stats восстанавливает испорченные счётчики"""
+        Post.objects.create(author=self.user, text='Пост', group=self.group1)
+        AuthorStats.objects.all().delete()
+        Group.objects.update(posts_count=7)
+        call_command('recount_stats', stdout=StringIO())
+        self.assertCounters(1, 1, 0)
@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, User
+from ..paginators import (
+    KEYSET_ORDERING, PREVIOUS, CachedCountPaginator, KeysetPaginator,
+    encode_cursor
+)
+
+PER_PAGE = 10
+POSTS_COUNT = 25
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}')
+            for i in range(POSTS_COUNT)
+        )
+        # Одинаковые даты проверяют разрешение совпадений по id.
+        Post.objects.update(pub_date=timezone.now())
+        cls.expected = list(Post.objects.order_by(*KEYSET_ORDERING))
+
+    def setUp(self):
+        cache.clear()
+        self.paginator = KeysetPaginator(Post.objects.all(), PER_PAGE)
+
+    def test_forward_walk_returns_every_post_once(self):
+        """Переход по курсорам next обходит все посты по порядку"""
+        page = self.paginator.get_page(None)
+        self.assertFalse(page.has_previous())
+        seen = list(page)
+        while page.has_next():
+            page = self.paginator.get_page(page.next_cursor)
+            seen.extend(page)
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор previous возвращает ту же страницу, что была до неё"""
+        first = self.paginator.get_page(None)
+        second = self.paginator.get_page(first.next_cursor)
+        back = self.paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_page_is_evaluated_lazily(self):
+        """Страница обращается к базе один раз и только при чтении"""
+        with CaptureQueriesContext(connection) as queries:
+            page = self.paginator.get_page(None)
+        self.assertEqual(len(queries), 0)
+        with CaptureQueriesContext(connection) as queries:
+            list(page)
+            page.next_cursor
+            page.has_previous()
+        self.assertEqual(len(queries), 1)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный токен ведёт на первую страницу"""
+        for cursor in ('garbage', '!!!', 'bnwx'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual(list(page), self.expected[:PER_PAGE])
+
+    def test_stale_previous_cursor_returns_first_page(self):
+        """Курсор previous без более новых постов ведёт на первую страницу"""
+        cursor = encode_cursor(PREVIOUS, self.expected[0])
+        page = self.paginator.get_page(cursor)
+        self.assertEqual(list(page), self.expected[:PER_PAGE])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': cursor})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_feed_view_uses_cursor(self):
+        """Лента отдаёт страницу по курсору из ссылки «Следующая»"""
+        response = self.client.get(reverse('posts:index'))
+        cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': cursor})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['page_obj']),
+                         self.expected[PER_PAGE:2 * PER_PAGE])
+
+
+class CachedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}')
+            for i in range(POSTS_COUNT)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, paginator):
+        with CaptureQueriesContext(connection) as queries:
+            paginator.count
+        return len(queries)
+
+    def test_count_is_taken_from_cache(self):
+        """COUNT(*) выполняется один раз, дальше количество из кеша"""
+        first = CachedCountPaginator(Post.objects.all(), PER_PAGE)
+        second = CachedCountPaginator(Post.objects.all(), PER_PAGE)
+        self.assertEqual(self.count_queries(first), 1)
+        self.assertEqual(self.count_queries(second), 0)
+        self.assertEqual(second.count, POSTS_COUNT)
+
+    def test_known_count_skips_database(self):
+        """Переданный счётчик используется без запросов к базе"""
+        paginator = CachedCountPaginator(Post.objects.all(), PER_PAGE,
+                                         count=POSTS_COUNT)
+        self.assertEqual(self.count_queries(paginator), 0)
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_stale_count_keeps_page_content(self):
+        """Устаревшее количество не обрезает содержимое страницы"""
+        paginator = CachedCountPaginator(Post.objects.all(), PER_PAGE,
+                                         count=PER_PAGE + 1)
+        self.assertEqual(len(paginator.page(2)), PER_PAGE)
+
+    def test_elided_page_range_length_does_not_grow(self):
+        """Диапазон номеров страниц не растёт вместе с числом страниц"""
+        paginator = CachedCountPaginator(Post.objects.all(), PER_PAGE,
+                                         count=PER_PAGE * 10000)
+        for number in (1, 5000, 10000):
+            with self.subTest(number=number):
+                page_range = list(paginator.get_elided_page_range(number))
+                self.assertIn(number, page_range)
+                self.assertIn(1, page_range)
+                self.assertIn(10000, page_range)
+                self.assertLessEqual(len(page_range), 9)
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post, PostSearchTerm, User
+from ..search import search, tokenize
+from ..stemmer import stem
+
+
+class StemmerTests(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова приводятся к общей основе"""
+        cases = {
+            'красив': ('красивая', 'красивый', 'красивыми'),
+            'дела': ('делали', 'делать', 'делал'),
+            'благодарн': ('благодарность', 'благодарности'),
+            'елк': ('ёлки', 'елка', 'ёлкой'),
+        }
+        for expected, words in cases.items():
+            for word in words:
+                with self.subTest(word=word):
+                    self.assertEqual(stem(word), expected)
+
+    def test_stop_words_are_dropped(self):
+        """Служебные слова не попадают в индекс"""
+        self.assertEqual(tokenize('Я и ты в лесу'), ['лес'])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.cats = Post.objects.create(
+            author=cls.author, text='Кошки любят кошку и рыбу')
+        cls.cat = Post.objects.create(
+            author=cls.author, text='Кошка спит, а собаки лают')
+        cls.dogs = Post.objects.create(
+            author=cls.author, text='Собака лает на прохожих')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_results_are_ranked(self):
+        """Пост, где слово встречается чаще, выше в выдаче"""
+        page = search('кошками')
+        self.assertEqual(list(page), [self.cats, self.cat])
+
+    def test_all_terms_required(self):
+        """Находятся только посты со всеми словами запроса"""
+        self.assertEqual(list(search('кошка собаки')), [self.cat])
+        self.assertEqual(list(search('кошка жираф')), [])
+
+    def test_cursor_walks_all_results(self):
+        """Курсор открывает следующую страницу без повторов"""
+        first = search('собака', per_page=1)
+        second = search('собака', first.next_cursor, per_page=1)
+        self.assertEqual({*first, *second}, {self.cat, self.dogs})
+        self.assertFalse(second.has_next())
+        self.assertTrue(second.has_previous())
+
+    def test_cursor_on_equal_scores(self):
+        """Посты с равным score не теряются и не повторяются на границе"""
+        twins = [Post.objects.create(author=self.author, text=f'Жираф {i}')
+                 for i in range(5)]
+        seen, cursor = [], None
+        while True:
+            page = search('жираф', cursor, per_page=2)
+            seen.extend(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, sorted(twins, key=lambda post: -post.pk))
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при изменении и удалении поста"""
+        post = Post.objects.create(author=self.author, text='Жираф')
+        self.assertEqual(list(search('жирафы')), [post])
+        post.text = 'Слон'
+        post.save()
+        self.assertEqual(list(search('жираф')), [])
+        self.assertEqual(list(search('слоны')), [post])
+        post.delete()
+        self.assertFalse(PostSearchTerm.objects.filter(term='слон').exists())
+
+    def test_search_view(self):
+        """Страница поиска показывает найденные посты"""
+        response = self.client.get(reverse('posts:search'),
+                                   {'q': 'собаки'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['page_obj']),
+                         [self.dogs, self.cat])
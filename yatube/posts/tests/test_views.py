@@ -1,10 +1,14 @@
 from http import HTTPStatus
 
 from django import forms
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ..models import Group, Post, User
+from ..views import POST_OBJ
 
 
 class TaskPagesTests(TestCase):
@@ -64,7 +68,7 @@ class TaskPagesTests(TestCase):
         self.assertContains(response, 'Это главная страница проекта Yatube')
         self.assertContains(response, 'Тестовый текст')
         self.assertIn('page_obj', response.context)
-        self.assertIn('posts', response.context)
+        self.assertNotIn('posts', response.context)
 
     def test_group_posts_view_context(self):
         response = self.client.get(reverse('posts:group_list',
@@ -74,7 +78,6 @@ class TaskPagesTests(TestCase):
         self.assertContains(response, 'Тестовый текст')
         self.assertIn('page_obj', response.context)
         self.assertIn('group', response.context)
-        self.assertIn('posts', response.context)
 
     def test_profile_view_context(self):
         response = self.client.get(reverse('posts:profile',
@@ -159,3 +162,55 @@ class TaskPagesTests(TestCase):
             reverse('posts:group_list', kwargs={'slug': self.group.slug})
         )
         self.assertNotContains(response, post_data['text'])
+
+
+class FeedQueryCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test',
+            description='Тестовое описание',
+        )
+
+    def create_posts(self, count):
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            author = self.author if i % 2 else User.objects.create_user(
+                username=f'author{i}')
+            Post.objects.create(author=author, text=f'Пост {i}',
+                                group=self.group)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """Число запросов ленты не растёт с числом постов на странице"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+        )
+        self.create_posts(2)
+        small = {url: self.count_queries(url) for url in urls}
+        self.create_posts(POST_OBJ - 2)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), small[url])
+
+    def test_group_feed_query_count(self):
+        """Страница группы: запрос группы и одной страницы её постов"""
+        self.create_posts(POST_OBJ)
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('posts:group_list', kwargs={'slug': 'test'})
+            )
+        self.assertEqual(len(response.context['page_obj']), POST_OBJ)
+        self.assertTrue(all(post.group_id == self.group.pk
+                            for post in response.context['page_obj']))
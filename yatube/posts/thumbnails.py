@@ -0,0 +1,132 @@
+"""Превью картинок постов, которые готовятся в фоновых процессах.
+
+После сохранения поста с картинкой задача уходит в пул процессов
+(THUMBNAIL_WORKERS), который сжимает картинку до размеров VARIANTS и
+пишет JPEG в MEDIA_ROOT/thumbnails/<вариант>/. Готовые адреса хранятся в
+кеше THUMBNAIL_CACHE_ALIAS по ключу картинки и варианта; при промахе
+наличие файла проверяется на диске, так что кеш можно потерять. Пока
+превью нет, шаблоны показывают заглушку; когда превью готовы, schedule
+вызывает on_ready, чтобы сбросить страницы с заглушкой. Ошибки пула
+только пишутся в лог: сохранение поста из-за них не падает.
+"""
+import functools
+import logging
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+
+VARIANTS = {
+    'small': (480, 480),
+    'large': (1200, 1200),
+}
+JPEG_QUALITY = 85
+KEY_PREFIX = 'thumbnail:'
+
+_executor = None
+logger = logging.getLogger(__name__)
+
+
+def thumbnail_cache():
+    return caches[settings.THUMBNAIL_CACHE_ALIAS]
+
+
+def variant_name(name, variant):
+    """Имя файла превью в хранилище медиа."""
+    root, _ = posixpath.splitext(name)
+    return posixpath.join('thumbnails', variant, root + '.jpg')
+
+
+def render(source, targets):
+    """Сжимает source во все варианты; выполняется в процессе пула.
+
+    targets — {вариант: путь файла}. Возвращает готовые варианты.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image.convert('RGBA'),
+                             mask=image.convert('RGBA'))
+            image = background
+        for variant, path in targets.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail(VARIANTS[variant], Image.LANCZOS)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Запись через временный файл: недописанное превью не отдаётся.
+            temporary = path + '.tmp'
+            thumbnail.save(temporary, 'JPEG', quality=JPEG_QUALITY,
+                           optimize=True, progressive=True)
+            os.replace(temporary, path)
+    return list(targets)
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(settings.THUMBNAIL_WORKERS)
+    return _executor
+
+
+def submit(function, *args):
+    global _executor
+    try:
+        return executor().submit(function, *args)
+    except BrokenProcessPool:
+        # Пул, в котором умер процесс, больше не принимает задачи.
+        _executor.shutdown(wait=False)
+        _executor = None
+        return executor().submit(function, *args)
+
+
+def remember(name, variants):
+    thumbnail_cache().set_many({
+        KEY_PREFIX + variant_name(name, variant):
+            default_storage.url(variant_name(name, variant))
+        for variant in variants
+    }, None)
+
+
+def finished(name, on_ready, future):
+    """Запоминает готовые превью; вызывается потоком пула."""
+    error = future.exception()
+    if error is not None:
+        logger.error('Не удалось подготовить превью %s', name,
+                     exc_info=error)
+        return
+    remember(name, future.result())
+    if on_ready is not None:
+        on_ready()
+
+
+def schedule(name, on_ready=None):
+    """Ставит картинку в очередь пула; возвращает Future с вариантами
+    или None, если задачу поставить не удалось.
+
+    on_ready() вызывается, когда превью записаны и запомнены.
+    """
+    targets = {variant: default_storage.path(variant_name(name, variant))
+               for variant in VARIANTS}
+    try:
+        future = submit(render, default_storage.path(name), targets)
+    except Exception:
+        logger.exception('Не удалось поставить в очередь превью %s', name)
+        return None
+    future.add_done_callback(functools.partial(finished, name, on_ready))
+    return future
+
+
+def thumbnail_url(name, variant):
+    """Адрес готового превью или None, пока его нет."""
+    key = KEY_PREFIX + variant_name(name, variant)
+    url = thumbnail_cache().get(key)
+    if url is None and default_storage.exists(variant_name(name, variant)):
+        url = default_storage.url(variant_name(name, variant))
+        thumbnail_cache().set(key, url, None)
+    return url
@@ -0,0 +1,136 @@
+"""Ленты подписок: посты авторов, на которых подписан пользователь.
+
+Новый пост сразу раскладывается по лентам подписчиков (TimelineEntry),
+и страница ленты читается по индексу (user, pub_date, post) без
+перебора подписок. Раскладывать посты автора с очень большим числом
+подписчиков слишком дорого, поэтому, когда подписчиков становится
+больше TIMELINE_FANOUT_LIMIT, автор переходит в режим чтения
+(AuthorStats.timeline_pull): его посты подмешиваются к ленте при
+чтении, одним запросом страницы на всех таких авторов. Режим не
+снимается, иначе из лент пропали бы посты, опубликованные в нём.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import KEYSET_ORDERING, NEXT, KeysetPaginator, seek
+
+PULLED_AUTHORS_KEY = 'timeline-pulled-authors'
+
+
+def pulled_authors():
+    """Id авторов в режиме чтения; их немного, список кешируется."""
+    authors = cache.get(PULLED_AUTHORS_KEY)
+    if authors is None:
+        authors = frozenset(AuthorStats.objects.filter(
+            timeline_pull=True
+        ).values_list('author_id', flat=True))
+        cache.set(PULLED_AUTHORS_KEY, authors,
+                  settings.TIMELINE_PULLED_TIMEOUT)
+    return authors
+
+
+def is_pulled(author_id):
+    # При записи флаг читается из базы, а не из кеша.
+    return AuthorStats.objects.filter(
+        author_id=author_id, timeline_pull=True
+    ).exists()
+
+
+def switch_to_pull(author_id):
+    """Переводит автора в режим чтения, если подписчиков стало много."""
+    switched = AuthorStats.objects.filter(
+        author_id=author_id, timeline_pull=False,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).update(timeline_pull=True)
+    if switched:
+        cache.delete(PULLED_AUTHORS_KEY)
+
+
+def fan_out(post):
+    """Записывает новый пост в ленты подписчиков автора."""
+    if is_pulled(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create((
+        TimelineEntry(user_id=user_id, post_id=post.pk,
+                      pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    ), ignore_conflicts=True)
+
+
+def add_author(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    if is_pulled(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        *KEYSET_ORDERING
+    ).values_list('pk', 'pub_date')[:settings.TIMELINE_BACKFILL]
+    TimelineEntry.objects.bulk_create((
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    ), ignore_conflicts=True)
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+class Timeline:
+    """Лента подписок пользователя для TimelinePaginator.
+
+    Срез [:n] возвращает n постов после ключа в направлении обхода:
+    по n записей из ленты и из постов авторов в режиме чтения, слитых
+    по (pub_date, id). Число запросов не зависит от числа подписок.
+    """
+
+    def __init__(self, user_id, direction=NEXT, key=None):
+        self.user_id = user_id
+        self.direction = direction
+        self.key = key
+
+    def seek(self, direction, pub_date, pk):
+        return Timeline(self.user_id, direction, (pub_date, pk))
+
+    def sources(self):
+        """Запросы ключей постов: лента и авторы в режиме чтения."""
+        yield TimelineEntry.objects.filter(user_id=self.user_id), 'post_id'
+        pulled = pulled_authors()
+        if not pulled:
+            return
+        followed = Follow.objects.filter(
+            user_id=self.user_id, author_id__in=pulled
+        ).values('author_id')
+        yield Post.objects.filter(author_id__in=followed), 'id'
+
+    def window(self, queryset, pk_field):
+        if self.key is None:
+            return queryset.order_by('-pub_date', f'-{pk_field}')
+        return seek(queryset, self.direction, *self.key, pk_field=pk_field)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.start or index.step:
+            raise TypeError('Лента поддерживает только срезы [:n].')
+        keys = set()
+        for queryset, pk_field in self.sources():
+            keys.update(self.window(queryset, pk_field).values_list(
+                'pub_date', pk_field)[:index.stop])
+        # Пост автора, перешедшего в режим чтения, может прийти из обоих
+        # источников: множество убирает повтор.
+        keys = sorted(keys, reverse=self.direction == NEXT)[:index.stop]
+        posts = Post.objects.for_feed().in_bulk([pk for _, pk in keys])
+        return [posts[pk] for _, pk in keys if pk in posts]
+
+
+class TimelinePaginator(KeysetPaginator):
+    """Курсорная пагинация ленты подписок, курсоры как у лент постов."""
+
+    def first(self):
+        return self.object_list
+
+    def after(self, direction, pub_date, pk):
+        return self.object_list.seek(direction, pub_date, pk)
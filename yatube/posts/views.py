@@ -1,81 +1,173 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
+from django.views.decorators.http import require_POST
 
-from .forms import PostForm
-from .models import Group, Post
+from core.decorators import query_budget
+
+from .caching import (
+    cache_anonymous_page, conditional_page, depend_on, depend_on_posts,
+    post_scopes
+)
+from .export import FORMATS, export_queryset, rows
+from .forms import ExportForm, PostForm
+from .models import AuthorStats, Follow, Group, Post
+from .paginators import (
+    KEYSET_ORDERING, CachedCountPaginator, KeysetPaginator
+)
+from .search import search
+from .timeline import Timeline, TimelinePaginator
 
 
 POST_OBJ = 10
 User = get_user_model()
 
 
-def paginate_posts(request, post_list):
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+def paginate_posts(request, post_list, count=None):
+    post_list = post_list.order_by(*KEYSET_ORDERING)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return KeysetPaginator(post_list, POST_OBJ).get_page(cursor)
+    paginator = CachedCountPaginator(post_list, POST_OBJ, count=count)
+    return paginator.get_page(request.GET.get('page'))
 
 
+@cache_anonymous_page
+@query_budget(4)
 def index(request):
-    posts = Post.objects.select_related('group')[:POST_OBJ]
-    post_list = Post.objects.all()
-    page_obj = paginate_posts(request, post_list)
+    depend_on(request, 'index')
+    page_obj = paginate_posts(request, Post.objects.for_feed())
+    depend_on_posts(request, page_obj)
     context = {
         'page_obj': page_obj,
-        'posts': posts,
         'title': 'Это главная страница проекта Yatube'
     }
     return render(request, 'posts/index.html', context)
 
 
+def page_object(request, queryset, **lookup):
+    """Объект страницы, загруженный проверкой conditional_page."""
+    found = getattr(request, 'page_object', None)
+    if found is None:
+        found = get_object_or_404(queryset, **lookup)
+    return found
+
+
+def group_modified(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    request.page_object = group
+    if group is None:
+        return None
+    request.page_scopes = [f'group:{group.pk}']
+    return group.last_modified
+
+
+def profile_modified(request, username):
+    user = User.objects.select_related('stats').filter(
+        username=username).first()
+    request.page_object = user
+    if user is None:
+        return None
+    request.page_scopes = [f'author:{user.pk}']
+    stats = getattr(user, 'stats', None)
+    return stats and stats.last_modified
+
+
+def post_modified(request, post_id):
+    """Изменение поста, а также автора и группы, показанных рядом."""
+    post = Post.objects.select_related(
+        'author', 'author__stats', 'group'
+    ).filter(pk=post_id).first()
+    request.page_object = post
+    if post is None:
+        return None
+    request.page_scopes = post_scopes(post)
+    stats = getattr(post.author, 'stats', None)
+    return max(date for date in (
+        post.updated_at, stats and stats.last_modified,
+        post.group and post.group.last_modified,
+    ) if date)
+
+
+@cache_anonymous_page
+@conditional_page(group_modified)
+@query_budget(4)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.group.all()[:POST_OBJ]
-    post_list = Post.objects.all()
-    page_obj = paginate_posts(request, post_list)
+    group = page_object(request, Group, slug=slug)
+    depend_on(request, f'group:{group.pk}')
+    post_list = Post.objects.group_feed(group)
+    page_obj = paginate_posts(request, post_list, group.posts_count)
+    depend_on_posts(request, page_obj)
     context = {
         'page_obj': page_obj,
         'group': group,
-        'posts': posts,
         'title': group.title
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_anonymous_page
+@conditional_page(profile_modified)
+@query_budget(5)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    post_list = user.posts.all()
-    page_obj = paginate_posts(request, post_list)
-    total_posts = post_list.count()
+    user = page_object(request, User, username=username)
+    depend_on(request, f'author:{user.pk}')
+    post_list = user.posts.for_feed()
+    total_posts = AuthorStats.posts_count_for(user.pk)
+    page_obj = paginate_posts(request, post_list, total_posts)
+    depend_on_posts(request, page_obj)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=user
+    ).exists()
     context = {
         'author': user,
         'page_obj': page_obj,
         'total_posts': total_posts,
+        'following': following,
         'title': f'Профайл пользователя {username}',
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cache_anonymous_page
+@conditional_page(post_modified)
+@query_budget(4)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    author_posts = Post.objects.filter(author=post.author)
+    post = page_object(
+        request, Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    depend_on(request, *post_scopes(post))
     context = {
         'post': post,
-        'total_posts': author_posts.count(),
+        'total_posts': AuthorStats.posts_count_for(post.author_id),
         'title': f'Пост: {post.text[:30]}',
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(6)
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = search(query, request.GET.get('cursor'), POST_OBJ)
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'title': f'Поиск: {query}' if query else 'Поиск',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with transaction.atomic():
+            post.save()
         return redirect('posts:profile',
                         username=request.user.username)
     return render(request, 'posts/create_post.html', {'form': form})
@@ -86,11 +178,13 @@ def post_edit(request, post_id):
     post = Post.objects.get(pk=post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post.id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with transaction.atomic():
+            post.save()
         return redirect('posts:post_detail', post_id=post.id)
     context = {
         'form': form,
@@ -98,3 +192,50 @@ def post_edit(request, post_id):
         'post': post
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+# Сессия, пользователь, лента, список авторов в режиме чтения, их посты
+# одним запросом и посты страницы.
+@query_budget(6)
+def follow_index(request):
+    paginator = TimelinePaginator(Timeline(request.user.pk), POST_OBJ)
+    context = {
+        'page_obj': paginator.get_page(request.GET.get('cursor')),
+        'title': 'Посты избранных авторов',
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username=username)
+
+
+@staff_member_required
+def export_posts(request):
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    filters = dict(form.cleaned_data)
+    export_format = filters.pop('format')
+    content_type, lines = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        lines(rows(export_queryset(**filters))), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"'
+    )
+    return response
@@ -0,0 +1,22 @@
+"""Настройки Yatube по окружениям: base, dev, prod и bench.
+
+Окружение выбирается переменной YATUBE_ENV (по умолчанию dev) или
+напрямую: DJANGO_SETTINGS_MODULE=yatube.settings.<окружение>.
+"""
+import os
+from importlib import import_module
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENTS = ('dev', 'prod', 'bench')
+
+_environment = os.environ.get('YATUBE_ENV', 'dev')
+if _environment not in ENVIRONMENTS:
+    raise ImproperlyConfigured(
+        f'YATUBE_ENV должна быть одной из: {", ".join(ENVIRONMENTS)}.'
+    )
+_settings = import_module(f'{__name__}.{_environment}')
+globals().update(
+    (name, value) for name, value in vars(_settings).items()
+    if name.isupper()
+)
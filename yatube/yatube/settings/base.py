@@ -0,0 +1,280 @@
+"""
+Общие настройки проекта Yatube для всех окружений (dev, prod, bench).
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+
+REQUIRED = object()
+
+
+def env(name, default=REQUIRED):
+    value = os.environ.get(name)
+    if value is None:
+        if default is REQUIRED:
+            raise ImproperlyConfigured(
+                f'Задайте переменную окружения {name}.'
+            )
+        return default
+    return value
+
+
+def env_bool(name, default):
+    return env(name, str(int(default))).lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    return int(env(name, default))
+
+
+def env_list(name, default=REQUIRED):
+    value = env(name, default)
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return value
+
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+# Django должен знать, откуда подгружать статические файлы:
+# в большом проекте может быть несколько директорий со статикой;
+# некоторые из этих директорий могут храниться даже на других серверах.
+# Адреса этих директорий указываются в файле settings.py,
+# списком или кортежем в константе STATICFILES_DIRS
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+# Значения по умолчанию годятся только для разработки,
+# yatube.settings.prod требует задать их через окружение.
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env('SECRET_KEY',
+                 '-0o+mraaikfx9#y8%4db%el1zs0qsw8y*ke9a#qqw!5(8so&r@')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env_bool('DEBUG', False)
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+])
+
+# Письма ставятся в очередь (core.mail), а отправляет их команда
+# send_queued_mail через QUEUED_EMAIL_BACKEND
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+#  подключаем движок filebased.EmailBackend
+QUEUED_EMAIL_BACKEND = env(
+    'QUEUED_EMAIL_BACKEND',
+    'django.core.mail.backends.filebased.EmailBackend'
+)
+# указываем директорию, в которую будут складываться файлы писем
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Писем в пачке, число попыток, задержка перед второй попыткой (дальше
+# удваивается) и сколько секунд взятая пачка скрыта от других
+# обработчиков
+QUEUED_EMAIL_BATCH_SIZE = 100
+QUEUED_EMAIL_MAX_ATTEMPTS = 5
+QUEUED_EMAIL_RETRY_DELAY = 60
+QUEUED_EMAIL_LEASE = 5 * 60
+
+# Сколько секунд количество постов в пагинаторе может отставать от
+# реального; таблицы меньше порога считаются точно, а не оцениваются
+PAGINATOR_COUNT_TIMEOUT = 60
+PAGINATOR_ESTIMATE_MIN_ROWS = 100000
+
+# Кеш страниц для анонимных посетителей (posts.caching): алиас из
+# CACHES и время жизни записи в секундах
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = 60 * 10
+# Карточки постов кешируются по версии поста и автора, поэтому живут долго
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Ленты подписок (posts.timeline): посты авторов, у которых подписчиков
+# больше TIMELINE_FANOUT_LIMIT, подмешиваются при чтении, а не
+# раскладываются по лентам; при подписке в ленту попадают последние
+# TIMELINE_BACKFILL постов автора; список таких авторов кешируется на
+# TIMELINE_PULLED_TIMEOUT секунд
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL = 100
+TIMELINE_PULLED_TIMEOUT = 60
+
+# Превышение бюджета запросов view (core.decorators.query_budget):
+# True — исключение, False — предупреждение в лог; manage.py test
+# всегда запускается в строгом режиме
+QUERY_BUDGET_STRICT = env_bool('QUERY_BUDGET_STRICT', False)
+TEST_RUNNER = 'core.test_runner.YatubeTestRunner'
+
+# Метрики запросов по view (core.middleware): доля замеряемых запросов,
+# алиас общего для процессов кеша гистограмм, длина скользящего окна
+# и шаг, с которым оно сдвигается, в минутах
+METRICS_SAMPLE_RATE = float(env('METRICS_SAMPLE_RATE', 0.05))
+METRICS_CACHE_ALIAS = 'metrics'
+METRICS_WINDOW_MINUTES = 60
+METRICS_SLOT_MINUTES = 5
+
+# База предназначена для нагрузочных прогонов: команда benchmark
+# заполняет её данными только при True (профиль bench) или с --force
+BENCHMARK_DATABASE = False
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'users:logout'
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE = [
+    'core.middleware.QueryMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        # DjangoTemplates с замером времени рендеринга для core.metrics
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'core.context_processors.cache_timeouts.cache_timeouts',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+# Компилировать все шаблоны при старте WSGI-процесса
+TEMPLATES_WARM_ON_STARTUP = False
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': env('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': env('DB_USER', ''),
+        'PASSWORD': env('DB_PASSWORD', ''),
+        'HOST': env('DB_HOST', ''),
+        'PORT': env('DB_PORT', ''),
+        # Сколько секунд держать соединение открытым между запросами
+        'CONN_MAX_AGE': env_int('CONN_MAX_AGE', 0),
+    }
+}
+# Проверять постоянное соединение в начале запроса (core.signals)
+DB_HEALTH_CHECKS = env_bool('DB_HEALTH_CHECKS', False)
+# PRAGMA для каждого нового соединения с SQLite (core.signals)
+SQLITE_PRAGMAS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': env('CACHE_BACKEND',
+                       'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', ''),
+    },
+    # Гистограммы core.metrics читают и пишут все процессы. На view в
+    # каждом интервале приходится до 129 ключей; при превышении
+    # MAX_ENTRIES кеш удаляет случайную треть ключей и гистограммы
+    # рассыпаются, поэтому запас рассчитан на сотни view за окно.
+    'metrics': {
+        'BACKEND': env('METRICS_CACHE_BACKEND',
+                       'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': env('METRICS_CACHE_LOCATION', os.path.join(
+            tempfile.gettempdir(), 'yatube-metrics'
+        )),
+        'OPTIONS': {
+            'MAX_ENTRIES': env_int('METRICS_CACHE_MAX_ENTRIES', 200000),
+        },
+    },
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+# Сюда collectstatic собирает статику для раздачи (core.static_files)
+STATIC_ROOT = env('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+# Раздавать STATIC_ROOT из wsgi.py, без отдельного веб-сервера
+STATIC_WSGI_SERVE = env_bool('STATIC_WSGI_SERVE', False)
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = env('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Превью картинок постов (posts.thumbnails): число фоновых процессов
+# и алиас кеша с адресами готовых превью
+THUMBNAIL_WORKERS = env_int('THUMBNAIL_WORKERS', 2)
+THUMBNAIL_CACHE_ALIAS = 'default'
@@ -0,0 +1,23 @@
+"""Боевые настройки для нагрузочных замеров на локальной машине."""
+import copy
+import os
+
+# Значения по умолчанию задаются до импорта: prod читает окружение.
+os.environ.setdefault('SECRET_KEY', 'bench-only-insecure-secret-key')
+os.environ.setdefault('ALLOWED_HOSTS', 'localhost,127.0.0.1,testserver')
+os.environ.setdefault('CACHE_BACKEND',
+                      'django.core.cache.backends.locmem.LocMemCache')
+
+from .prod import *  # noqa: E402,F401,F403
+from .prod import BASE_DIR, DATABASES, env  # noqa: E402
+
+# base мог быть импортирован раньше (yatube.settings грузит профиль
+# по умолчанию), поэтому имя базы задаётся здесь, а не через DB_NAME.
+DATABASES = copy.deepcopy(DATABASES)
+DATABASES['default']['NAME'] = env(
+    'BENCH_DB_NAME', os.path.join(BASE_DIR, 'bench.sqlite3')
+)
+# Команда benchmark может заполнять эту базу.
+BENCHMARK_DATABASE = True
+# Замер идёт в одном процессе, кеш в его памяти ничему не мешает.
+SILENCED_SYSTEM_CHECKS = ['core.E003']
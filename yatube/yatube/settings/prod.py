@@ -0,0 +1,54 @@
+"""Настройки для боевого окружения."""
+import copy
+
+from .base import *  # noqa: F401,F403
+from .base import (
+    CACHES, DATABASES, TEMPLATES, env, env_bool, env_int, env_list
+)
+
+SECRET_KEY = env('SECRET_KEY')
+DEBUG = env_bool('DEBUG', False)
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS')
+
+# Кеш страниц и версии их областей должны быть общими для воркеров,
+# поэтому бэкенд задаётся явно (проверка core.E003).
+CACHES = copy.deepcopy(CACHES)
+CACHES['default'] = {
+    'BACKEND': env('CACHE_BACKEND'),
+    'LOCATION': env('CACHE_LOCATION', ''),
+}
+
+# Соединение с базой переиспользуется между запросами и проверяется
+# в начале запроса, чтобы не отдать ошибку на оборванном соединении.
+DATABASES = copy.deepcopy(DATABASES)
+DATABASES['default']['CONN_MAX_AGE'] = env_int('CONN_MAX_AGE', 60)
+DB_HEALTH_CHECKS = env_bool('DB_HEALTH_CHECKS', True)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # WAL позволяет читать параллельно с записью, а timeout заставляет
+    # писателей ждать блокировку до 20 секунд вместо ошибки. PRAGMA
+    # busy_timeout не задаётся: она заменила бы это значение.
+    DATABASES['default']['OPTIONS'] = {'timeout': 20}
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,
+        'temp_store': 'MEMORY',
+        'mmap_size': 256 * 1024 * 1024,
+    }
+
+# Шаблоны читаются с диска и разбираются один раз на процесс,
+# wsgi.py прогревает кеш загрузчика при старте.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES_WARM_ON_STARTUP = True
+
+# Имена с хешем и сжатые копии создаются при collectstatic, wsgi.py
+# раздаёт их с Cache-Control: immutable.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_WSGI_SERVE = env_bool('STATIC_WSGI_SERVE', True)
@@ -1,5 +1,6 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
-
 from django.urls import include, path
 
 urlpatterns = [
@@ -9,3 +10,7 @@ urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL,
+                          document_root=settings.MEDIA_ROOT)
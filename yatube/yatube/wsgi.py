@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATES_WARM_ON_STARTUP:
+    from core.warmup import warm_templates
+    warm_templates()
+
+if settings.STATIC_WSGI_SERVE:
+    from core.static_files import StaticFilesApplication
+    application = StaticFilesApplication(
+        application, settings.STATIC_ROOT, settings.STATIC_URL
+    )